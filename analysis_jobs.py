@@ -0,0 +1,141 @@
+"""
+AI 분석 백그라운드 작업 - 워커 풀에서 실행, 결과는 디스크에 저장, 같은 요청은 하나의 작업으로 합침
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ANALYSIS_RESULTS_DIR = os.path.join('.cache', 'analysis')
+ANALYSIS_WORKERS = 2
+_JOB_ID = re.compile(r'[0-9a-f]{32}')
+
+
+def analysis_job_id(patents, analysis_key, user_question):
+    """같은 특허 집합 + 분석 유형 + 질문이면 같은 작업 ID"""
+    payload = json.dumps(
+        {'patents': patents, 'analysis_key': analysis_key, 'user_question': (user_question or '').strip()},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def is_analysis_job_id(value):
+    """analysis_job_id 형식(소문자 16진수 32자)인지 - 주소창에서 온 값은 파일 경로로 쓰기 전에 확인"""
+    return isinstance(value, str) and _JOB_ID.fullmatch(value) is not None
+
+
+def stream_analysis(analyzer, patents, analysis_key, user_question):
+    """분석 결과를 조각 단위로 yield
+
+    analyzer에 ``comprehensive_analysis_stream``(토큰 generator)이 있으면 그것을 쓰고,
+    없으면 ``comprehensive_analysis`` 결과 전체를 한 조각으로 낸다.
+    """
+    if hasattr(analyzer, 'comprehensive_analysis_stream'):
+        yield from analyzer.comprehensive_analysis_stream(patents, analysis_key, user_question)
+    else:
+        yield analyzer.comprehensive_analysis(patents, analysis_key, user_question)
+
+
+class AnalysisJobs:
+    """``analyze``(기본: ``stream_analysis``)를 백그라운드 스레드에서 실행하는 작업 관리자
+
+    ``analyze``는 결과 문자열이나 텍스트 조각 iterable을 반환한다. 세션은 작업 ID만
+    들고 있다가 ``status``로 상태와 지금까지 도착한 출력을 확인한다 (기다리지 않음).
+    끝난 결과는 ``results_dir``에 JSON으로 저장되므로 재실행/재접속하거나 다른 세션이
+    같은 요청을 보내도 다시 분석하지 않는다.
+    """
+
+    def __init__(self, results_dir=ANALYSIS_RESULTS_DIR, workers=ANALYSIS_WORKERS, analyze=stream_analysis):
+        self.results_dir = results_dir
+        self.analyze = analyze
+        os.makedirs(results_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis')
+        self._jobs = {}  # job_id -> 실행 중/실패한 작업 정보 (지금까지 나온 조각 포함)
+        self._lock = threading.Lock()
+
+    def _result_path(self, job_id):
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def _load_result(self, job_id):
+        """저장된 결과 (없거나 작업 ID/기록 형식이 잘못되면 None)"""
+        if not is_analysis_job_id(job_id):
+            return None
+        try:
+            with open(self._result_path(job_id), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not (isinstance(record, dict) and isinstance(record.get('result'), str)
+                and isinstance(record.get('meta'), dict) and isinstance(record.get('elapsed'), (int, float))):
+            return None
+        return record
+
+    def submit(self, analyzer, patents, analysis_key, user_question, meta=None):
+        """분석 작업을 시작하고 작업 ID 반환 - 이미 끝났거나 실행 중인 같은 요청이 있으면 그 ID"""
+        job_id = analysis_job_id(patents, analysis_key, user_question)
+        if self._load_result(job_id) is not None:
+            return job_id
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['state'] == 'running':
+                return job_id
+            self._jobs[job_id] = {
+                'state': 'running',
+                'started_at': time.time(),
+                'meta': meta or {},
+                'error': None,
+                'parts': [],
+            }
+        self._executor.submit(self._run, job_id, analyzer, patents, analysis_key, user_question)
+        return job_id
+
+    def _run(self, job_id, analyzer, patents, analysis_key, user_question):
+        job = self._jobs[job_id]
+        try:
+            result = self.analyze(analyzer, patents, analysis_key, user_question)
+            for part in [result] if isinstance(result, str) else result:
+                with self._lock:
+                    job['parts'].append(part)
+            record = {
+                'result': ''.join(job['parts']),
+                'elapsed': time.time() - job['started_at'],
+                'finished_at': time.time(),
+                'meta': job['meta'],
+            }
+            # 저장이 실패해도 (디스크 가득 참 등) 작업을 failed로 남겨야 계속 실행 중으로 보이지 않음
+            path = self._result_path(job_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            with self._lock:
+                job.update(state='failed', error=str(e))
+            return
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def status(self, job_id):
+        """{'state': 'running'|'done'|'failed'|'unknown', ...}
+
+        done이면 result/elapsed/meta, 실행 중이면 지금까지 나온 출력(partial)을 포함한다.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return {
+                    'state': job['state'],
+                    'elapsed': time.time() - job['started_at'],
+                    'meta': job['meta'],
+                    'error': job['error'],
+                    'partial': ''.join(job['parts']),
+                }
+        record = self._load_result(job_id)
+        if record is not None:
+            return {'state': 'done', **record}
+        return {'state': 'unknown'}
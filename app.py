@@ -4,9 +4,9 @@ import streamlit as st
 # Set page configuration
 st.set_page_config(page_title="Simple Bulletin Board", layout="wide")
 
-# Initialize session state for posts and post ID counter
+# Initialize session state for posts (keyed by ID) and post ID counter
 if 'posts' not in st.session_state:
-    st.session_state.posts = []
+    st.session_state.posts = {}
 if 'post_id_counter' not in st.session_state:
     st.session_state.post_id_counter = 0
 
@@ -15,7 +15,7 @@ def create_post(title, content):
     """Adds a new post to the session state."""
     st.session_state.post_id_counter += 1
     new_post = {"id": st.session_state.post_id_counter, "title": title, "content": content}
-    st.session_state.posts.append(new_post)
+    st.session_state.posts[new_post['id']] = new_post
     st.success("Post created successfully!")
 
 def read_posts():
@@ -24,32 +24,24 @@ def read_posts():
         st.info("No posts yet. Create one!")
         return
 
-    # Sort posts by ID in descending order to show newest first
-    sorted_posts = sorted(st.session_state.posts, key=lambda x: x['id'], reverse=True)
-
-    for post in sorted_posts:
+    # IDs only grow and dicts keep insertion order, so reversing gives newest first without sorting
+    for post in reversed(st.session_state.posts.values()):
         with st.expander(f"#{post['id']} - {post['title']}"):
             st.write(post['content'])
 
 def update_post(post_id, new_title, new_content):
     """Updates an existing post."""
-    for post in st.session_state.posts:
-        if post['id'] == post_id:
-            post['title'] = new_title
-            post['content'] = new_content
-            st.success("Post updated successfully!")
-            return
-    st.error("Post not found.")
+    post = st.session_state.posts.get(post_id)
+    if post:
+        post['title'] = new_title
+        post['content'] = new_content
+        st.success("Post updated successfully!")
+    else:
+        st.error("Post not found.")
 
 def delete_post(post_id):
     """Deletes a post."""
-    post_to_delete = None
-    for post in st.session_state.posts:
-        if post['id'] == post_id:
-            post_to_delete = post
-            break
-    if post_to_delete:
-        st.session_state.posts.remove(post_to_delete)
+    if st.session_state.posts.pop(post_id, None):
         st.success("Post deleted successfully!")
     else:
         st.error("Post not found.")
@@ -89,11 +81,11 @@ if choice == "Update":
     if not st.session_state.posts:
         st.info("No posts to update.")
     else:
-        post_ids = [post['id'] for post in st.session_state.posts]
+        post_ids = list(st.session_state.posts)
         selected_id = st.selectbox("Select Post to Update by ID", post_ids)
 
         if selected_id:
-            selected_post = next((post for post in st.session_state.posts if post['id'] == selected_id), None)
+            selected_post = st.session_state.posts.get(selected_id)
             if selected_post:
                 with st.form("update_form"):
                     new_title = st.text_input("New Title", value=selected_post['title'])
@@ -111,7 +103,7 @@ elif choice == "Delete":
     if not st.session_state.posts:
         st.info("No posts to delete.")
     else:
-        post_ids = [post['id'] for post in st.session_state.posts]
+        post_ids = list(st.session_state.posts)
         selected_id_to_delete = st.selectbox("Select Post to Delete by ID", post_ids)
 
         if selected_id_to_delete:
@@ -0,0 +1,114 @@
+"""
+출원인 사전 - 이름 정규화((주)/주식회사, 공백, 전각/대소문자) + 정렬 배열 접두어 색인, 자동완성/고유 기업 수
+"""
+
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+APPLICANT_DIRECTORY_PATH = os.path.join('.cache', 'applicants.json')
+
+# 회사 형태 표기 - 같은 회사의 표기 차이로 보고 제거 (NFKC 후라 ㈜는 (주)로 바뀌어 있음)
+_CORPORATE_MARKERS = re.compile(
+    r'\((주|유|사|재)\)|주식회사|유한회사|유한책임회사|사단법인|재단법인'
+    r'|\b(co|corp|corporation|company|inc|incorporated|ltd|limited|llc|gmbh)\b\.?'
+)
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_applicant(name):
+    """비교용 출원인 키 - '삼성전자 주식회사', '삼성전자(주)', '㈜삼성전자' → '삼성전자'"""
+    text = unicodedata.normalize('NFKC', name).lower()  # 전각 영숫자 → 반각, ㈜ → (주)
+    key = _NON_WORD.sub('', _CORPORATE_MARKERS.sub(' ', text))
+    return key or _NON_WORD.sub('', text)
+
+
+class ApplicantIndex:
+    """정규화된 출원인 키의 정렬 배열 + 키별 건수/원래 표기
+
+    접두어 검색은 정렬 배열에서 ``bisect``로 범위를 찾고, 새 출원인은 ``insort``로
+    끼워 넣으므로 특허가 들어올 때마다 증분으로 갱신된다.
+    """
+
+    def __init__(self):
+        self.keys = []  # 정렬된 정규화 키
+        self.counts = Counter()  # 키 -> 건수
+        self.names = {}  # 키 -> Counter(원래 표기 -> 건수)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, applicant_counts):
+        """{출원인 이름: 건수} 반영"""
+        with self._lock:
+            for name, count in applicant_counts.items():
+                if not name or count <= 0:
+                    continue
+                key = normalize_applicant(name)
+                if not key:
+                    continue
+                if key not in self.counts:
+                    bisect.insort(self.keys, key)
+                    self.names[key] = Counter()
+                self.counts[key] += count
+                self.names[key][name] += count
+
+    def remove(self, applicant_counts):
+        """{출원인 이름: 건수} 제외 - 건수가 0이 된 키는 색인에서 삭제"""
+        with self._lock:
+            for name, count in applicant_counts.items():
+                key = normalize_applicant(name) if name else ''
+                if key not in self.counts:
+                    continue
+                self.counts[key] -= count
+                self.names[key][name] -= count
+                self.names[key] = +self.names[key]
+                if self.counts[key] <= 0:
+                    del self.counts[key]
+                    del self.names[key]
+                    del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def display_name(self, key):
+        """키의 대표 표기 (가장 많이 나온 원래 이름)"""
+        return self.names[key].most_common(1)[0][0]
+
+    def prefix(self, text):
+        """정규화한 text로 시작하는 키 목록 (정렬 순)"""
+        key = normalize_applicant(text) if text else ''
+        with self._lock:
+            start = bisect.bisect_left(self.keys, key)
+            end = bisect.bisect_left(self.keys, key + '\U0010ffff')
+            return self.keys[start:end]
+
+    def complete(self, text, limit=10):
+        """자동완성 - text로 시작하는 출원인 [(대표 표기, 건수)] 건수 내림차순"""
+        keys = heapq.nlargest(limit, self.prefix(text), key=lambda key: self.counts[key])
+        return [(self.display_name(key), self.counts[key]) for key in keys]
+
+    def save(self, path=APPLICANT_DIRECTORY_PATH):
+        with self._lock:
+            data = {key: dict(names) for key, names in self.names.items()}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=APPLICANT_DIRECTORY_PATH):
+        """저장된 사전 (없거나 깨졌으면 빈 사전)"""
+        index = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        for names in data.values():
+            index.add(names)
+        return index
@@ -0,0 +1,114 @@
+"""
+연도별 출원 차트 렌더링 캐시 - 같은 데이터/옵션이면 matplotlib 없이 PNG 재사용
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib
+from matplotlib.figure import Figure
+
+CHART_CACHE_DIR = os.path.join(os.getcwd(), '.cache', 'charts')
+MEMORY_CACHE_SIZE = 32  # 메모리에 보관할 PNG 개수
+DISK_CACHE_SIZE = 256  # 디스크에 보관할 PNG 개수
+CHART_VERSION = 1  # 차트 모양을 바꾸면 올려서 기존 캐시 무효화
+
+_memory_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _chart_key(years, counts, korean_support, options):
+    payload = {
+        'version': CHART_VERSION,
+        'years': list(years),
+        'counts': list(counts),
+        'korean_support': bool(korean_support),
+        'font_family': list(matplotlib.rcParams['font.family']),
+        'options': options,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _render(years, counts, korean_support, figsize, dpi):
+    """실제 matplotlib 렌더링 - 캐시 미스일 때만 실행"""
+    # pyplot 전역 상태를 쓰지 않는 Figure라서 여러 세션이 동시에 그려도 안전
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.subplots()
+    ax.bar(years, counts, color='#3b82f6', alpha=0.8)
+
+    # 한글 지원 여부에 따라 제목 설정
+    if korean_support:
+        ax.set_title('연도별 특허 출원 현황', fontsize=16, fontweight='bold')
+        ax.set_xlabel('연도', fontsize=12)
+        ax.set_ylabel('출원 건수', fontsize=12)
+    else:
+        ax.set_title('Patent Applications by Year', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Year', fontsize=12)
+        ax.set_ylabel('Applications', fontsize=12)
+
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def _read_disk(key):
+    path = os.path.join(CHART_CACHE_DIR, f"{key}.png")
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)  # LRU 순서 갱신
+        return data
+    except OSError:
+        return None
+
+
+def _write_disk(key, data):
+    try:
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+        path = os.path.join(CHART_CACHE_DIR, f"{key}.png")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # 오래 안 쓴 파일부터 정리
+        files = [os.path.join(CHART_CACHE_DIR, name) for name in os.listdir(CHART_CACHE_DIR) if name.endswith('.png')]
+        if len(files) > DISK_CACHE_SIZE:
+            files.sort(key=os.path.getmtime)
+            for old_path in files[:len(files) - DISK_CACHE_SIZE]:
+                os.remove(old_path)
+    except OSError:
+        pass  # 디스크 캐시는 선택 사항 - 실패해도 렌더링 결과는 반환
+
+
+def year_chart_png(years, counts, korean_support, figsize=(12, 6), dpi=100):
+    """연도별 출원 막대 차트 PNG 바이트
+
+    집계 결과, 한글 지원 여부, 폰트, 그림 옵션의 해시를 키로 메모리(LRU) → 디스크 → 렌더링 순으로 찾는다.
+    """
+    key = _chart_key(years, counts, korean_support, {'figsize': list(figsize), 'dpi': dpi})
+
+    with _lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return _memory_cache[key]
+
+    data = _read_disk(key)
+    if data is None:
+        data = _render(years, counts, korean_support, figsize, dpi)
+        _write_disk(key, data)
+
+    with _lock:
+        _memory_cache[key] = data
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    return data
@@ -0,0 +1,121 @@
+"""
+대량 특허 맵리듀스 분석 - 토큰 예산 단위로 나눠 동시에 분석하고 부분 결과를 합침, 청크별 결과는 캐시
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis_jobs import stream_analysis
+from sqlite_cache import SqliteLruCache
+
+CHUNK_CACHE_PATH = os.path.join('.cache', 'analysis_chunks.db')
+CHUNK_CACHE_SIZE = 2000  # 보관할 청크 결과 개수 (오래 안 쓴 것부터 삭제)
+CHUNK_TOKEN_BUDGET = 6000  # 청크 하나의 프롬프트 토큰 상한 (대략)
+CHUNK_TARGET_SIZE = 40  # 평균 청크 크기 (건) - 내용 기반 경계의 간격
+CHUNK_VERSION = 1  # 청크 분석 프롬프트/모델을 바꾸면 올려서 기존 결과 무효화
+MAP_WORKERS = 4
+PROMPT_FIELDS = ('app_num', 'title', 'applicant', 'app_date', 'reg_status', 'abstract')
+
+
+def _patent_text(patent):
+    return json.dumps({key: patent.get(key) for key in PROMPT_FIELDS if patent.get(key)},
+                      ensure_ascii=False, sort_keys=True)
+
+
+def estimate_tokens(patent):
+    """프롬프트에 들어갈 특허 하나의 대략적인 토큰 수 (한글 기준 2자 ≈ 1토큰)"""
+    return len(_patent_text(patent)) // 2 + 1
+
+
+def _sort_key(patent):
+    return (patent.get('app_num') or '', _patent_text(patent))
+
+
+def chunk_patents(patents, token_budget=CHUNK_TOKEN_BUDGET, target_size=CHUNK_TARGET_SIZE):
+    """특허를 출원번호 순으로 정렬해 토큰 예산 안의 청크로 분할
+
+    전체가 예산 안에 들어가면 나누지 않고 청크 하나로 돌려준다.
+    넘치면 먼저 특허 내용 해시로 구간 경계를 정하고 (내용 기반 분할), 예산을 넘는
+    구간만 그 안에서 다시 자른다. 그래서 특허 몇 건이 추가/삭제되어도 그 특허가 속한
+    구간의 청크만 바뀌고 나머지 청크는 그대로 캐시를 재사용한다.
+    """
+    patents = sorted(patents, key=_sort_key)
+    if sum(estimate_tokens(patent) for patent in patents) <= token_budget:
+        return [patents] if patents else []
+
+    segments, segment = [], []
+    for patent in patents:
+        segment.append(patent)
+        digest = hashlib.sha256(_patent_text(patent).encode()).digest()
+        if int.from_bytes(digest[:4], 'big') % target_size == 0:
+            segments.append(segment)
+            segment = []
+    if segment:
+        segments.append(segment)
+
+    chunks = []
+    for segment in segments:
+        chunk, tokens = [], 0
+        for patent in segment:
+            cost = estimate_tokens(patent)
+            if chunk and tokens + cost > token_budget:
+                chunks.append(chunk)
+                chunk, tokens = [], 0
+            chunk.append(patent)
+            tokens += cost
+        chunks.append(chunk)
+    return chunks
+
+
+def chunk_key(chunk, analysis_key):
+    """청크 내용 + 분석 유형 해시 - 사용자 질문은 리듀스 단계에서만 쓰므로 키에 넣지 않음"""
+    payload = '\n'.join([str(CHUNK_VERSION), analysis_key] + [_patent_text(patent) for patent in chunk])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ChunkedAnalysis:
+    """``analyzer.comprehensive_analysis``를 청크 단위 맵리듀스로 실행
+
+    맵: 청크마다 질문 없이 분석해 부분 결과를 SQLite에 캐시 (스레드 풀에서 동시 실행).
+    리듀스: 부분 결과들을 사용자 질문과 함께 한 번 더 분석해 최종 보고서를 만든다.
+    analyzer에 ``reduce_analysis(partials, analysis_key, user_question)``가 있으면 그것을,
+    없으면 부분 결과를 특허 형식으로 감싸 ``comprehensive_analysis``에 넘긴다.
+    청크가 하나뿐이면 기존처럼 한 번에 분석한다. 최종 단계 출력은 ``stream_analysis``로
+    조각 단위로 내보낸다.
+    """
+
+    def __init__(self, path=CHUNK_CACHE_PATH, token_budget=CHUNK_TOKEN_BUDGET, workers=MAP_WORKERS,
+                 max_entries=CHUNK_CACHE_SIZE):
+        self.token_budget = token_budget
+        self._cache = SqliteLruCache(path, 'chunks', 'result', max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis-map')
+
+    def _map(self, analyzer, chunk, analysis_key):
+        """청크 하나 분석 (캐시에 있으면 재사용)"""
+        key = chunk_key(chunk, analysis_key)
+        result = self._cache.get(key)
+        if result is None:
+            result = analyzer.comprehensive_analysis(chunk, analysis_key, '')
+            self._cache.put(key, result)
+        return result
+
+    def _reduce(self, analyzer, partials, analysis_key, user_question):
+        if hasattr(analyzer, 'reduce_analysis'):
+            yield analyzer.reduce_analysis(partials, analysis_key, user_question)
+            return
+        summaries = [
+            {'title': f"부분 분석 {i}/{len(partials)}", 'abstract': partial}
+            for i, partial in enumerate(partials, start=1)
+        ]
+        yield from stream_analysis(analyzer, summaries, analysis_key, user_question)
+
+    def analyze(self, analyzer, patents, analysis_key, user_question):
+        """comprehensive_analysis와 같은 인자로 결과 조각을 yield - AnalysisJobs의 analyze로 그대로 사용"""
+        chunks = chunk_patents(patents, self.token_budget)
+        if len(chunks) <= 1:
+            yield from stream_analysis(analyzer, patents, analysis_key, user_question)
+            return
+        partials = list(self._executor.map(lambda chunk: self._map(analyzer, chunk, analysis_key), chunks))
+        yield from self._reduce(analyzer, partials, analysis_key, user_question)
@@ -0,0 +1,96 @@
+"""
+customFonts/ 한글 폰트 등록 - 폰트 목록을 디스크에 캐시해 콜드 스타트 단축
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+
+import matplotlib
+import matplotlib.font_manager as fm
+from matplotlib import ft2font
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+
+def _font_files(font_dir):
+    """폰트 디렉터리의 폰트 파일 목록 (정렬됨)"""
+    if not os.path.isdir(font_dir):
+        return []
+    return sorted(
+        os.path.join(font_dir, name)
+        for name in os.listdir(font_dir)
+        if name.lower().endswith(FONT_EXTENSIONS)
+    )
+
+
+def _fonts_key(font_files):
+    """파일 이름/크기/수정시각으로 만든 폰트 디렉터리 해시 - 폰트가 바뀌면 값도 바뀜"""
+    digest = hashlib.sha256()
+    for path in font_files:
+        st = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _cache_path(font_dir):
+    dir_hash = hashlib.sha256(os.path.abspath(font_dir).encode()).hexdigest()[:16]
+    return os.path.join(matplotlib.get_cachedir(), f"customfonts-{dir_hash}.json")
+
+
+def _scan_fonts(font_files):
+    """폰트 파일을 직접 파싱 - 폰트가 바뀌었을 때만 실행되는 느린 경로"""
+    entries = []
+    for path in font_files:
+        try:
+            entries.append(dataclasses.asdict(fm.ttfFontProperty(ft2font.FT2Font(path))))
+        except Exception:
+            continue  # 깨진 폰트 파일은 건너뜀
+    return entries
+
+
+def _load_entries(font_dir):
+    """캐시된 폰트 목록을 읽고, 폰트가 바뀌었으면 다시 스캔해서 캐시에 저장"""
+    font_files = _font_files(font_dir)
+    key = _fonts_key(font_files)
+    cache_path = _cache_path(font_dir)
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['fonts']
+    except (OSError, ValueError):
+        pass
+
+    entries = _scan_fonts(font_files)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'fonts': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 캐시 저장 실패는 다음 시작 때 다시 스캔할 뿐
+    return entries
+
+
+def register_custom_fonts(font_dir, families=None):
+    """font_dir의 폰트를 matplotlib에 등록하고 등록한 폰트 이름 목록을 반환
+
+    시스템 폰트 전체를 다시 읽는 ``fm._load_fontmanager(try_read_cache=False)`` 대신
+    캐시된 폰트 정보만 ``fontManager.ttflist``에 추가한다. ``families``를 주면
+    그 이름의 폰트만 등록한다. 같은 프로세스에서 여러 번 호출해도 중복 등록되지 않음.
+    """
+    registered_files = {font.fname for font in fm.fontManager.ttflist}
+    names = []
+    for entry in _load_entries(font_dir):
+        if families and entry['name'] not in families:
+            continue
+        if entry['fname'] not in registered_files:
+            fm.fontManager.ttflist.append(fm.FontEntry(**entry))
+            registered_files.add(entry['fname'])
+        names.append(entry['name'])
+    # findfont 결과 캐시를 비워 새 폰트가 바로 보이도록 함
+    fm.fontManager._findfont_cached.cache_clear()
+    return names
@@ -0,0 +1,90 @@
+"""Resized renditions of uploaded images for the image bulletin board."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+# --- Configuration ---
+RENDITIONS = {
+    'thumb': 256,  # Longest edge in pixels
+    'feed': 720,
+}
+RENDITION_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+RENDITION_QUALITY = 80
+RESIZE_WORKERS = 2
+
+_EXTENSIONS = {'WEBP': '.webp', 'JPEG': '.jpg'}
+_executor = ThreadPoolExecutor(max_workers=RESIZE_WORKERS, thread_name_prefix='image-resize')
+
+
+def rendition_path(image_path, name):
+    """Returns where the ``name`` rendition of ``image_path`` is stored (next to the original)."""
+    stem, _ = os.path.splitext(image_path)
+    return f"{stem}.{name}{_EXTENSIONS[RENDITION_FORMAT]}"
+
+
+def make_renditions(image_path):
+    """Writes every rendition of ``image_path`` and returns {name: path}.
+
+    Animated images are left alone so the feed keeps showing the original.
+    Uploads are content-addressed, so renditions that already exist are
+    reused. Each file is written under a temp name and renamed, so a reader
+    never picks up a half-written rendition.
+    """
+    paths = {name: rendition_path(image_path, name) for name in RENDITIONS}
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+    paths = {}
+    with Image.open(image_path) as img:
+        if getattr(img, 'is_animated', False):
+            return paths
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        if RENDITION_FORMAT == 'JPEG' and img.mode == 'RGBA':
+            img = img.convert('RGB')
+        for name, size in RENDITIONS.items():
+            resized = img.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            path = rendition_path(image_path, name)
+            tmp_path = f"{path}.tmp"
+            resized.save(tmp_path, RENDITION_FORMAT, quality=RENDITION_QUALITY)
+            os.replace(tmp_path, path)
+            paths[name] = path
+    return paths
+
+
+def submit_renditions(image_path, written=None):
+    """Queues ``make_renditions`` on the worker pool and returns its future.
+
+    ``written`` (e.g. ``UploadStore.add``) is called with each rendition path
+    once the file is in place.
+    """
+    def run():
+        paths = make_renditions(image_path)
+        if written is not None:
+            for path in paths.values():
+                written(path)
+        return paths
+
+    return _executor.submit(run)
+
+
+def all_rendition_paths(image_path):
+    """Returns the paths of every rendition of ``image_path``, whether or not they exist."""
+    return [rendition_path(image_path, name) for name in RENDITIONS]
+
+
+def display_path(image_path, name, exists=os.path.exists):
+    """Returns the ``name`` rendition if it is ready, otherwise the original."""
+    path = rendition_path(image_path, name)
+    return path if exists(path) else image_path
+
+
+def remove_renditions(image_path, remove=os.remove):
+    """Deletes every rendition of ``image_path`` that exists."""
+    for path in all_rendition_paths(image_path):
+        try:
+            remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,134 @@
+"""
+KIPRIS 검색 결과 병렬 수집기 - 커넥션 풀 + 페이지 동시 요청 + 재시도 + 실제 진행률
+"""
+
+import math
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+KIPRIS_SEARCH_URL = "http://plus.kipris.or.kr/kipo-api/kipi/patUtiModInfoSearchSevice/getAdvancedSearch"
+PAGE_SIZE = 100  # 한 번에 요청할 건수 (numOfRows)
+MAX_WORKERS = 4  # 동시에 요청할 페이지 수 = 커넥션 풀 크기
+REQUESTS_PER_SECOND = 8  # API 호출 제한
+REQUEST_TIMEOUT = 15
+
+# KIPRIS 응답 item 태그 → 앱에서 쓰는 특허 dict 키
+ITEM_FIELDS = {
+    'applicationNumber': 'app_num',
+    'inventionTitle': 'title',
+    'applicantName': 'applicant',
+    'applicationDate': 'app_date',
+    'registerStatus': 'reg_status',
+    'astrtCont': 'abstract',
+}
+
+
+class RetryableResponse(Exception):
+    """재시도하면 성공할 수 있는 응답 (429, 5xx)"""
+
+
+class RateLimiter:
+    """초당 요청 수 제한 - 여러 스레드가 공유하는 최소 호출 간격"""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def parse_page(xml_text):
+    """KIPRIS XML 응답 한 페이지 → (전체 건수, 특허 dict 리스트)"""
+    root = ET.fromstring(xml_text)
+    total = int(root.findtext('.//totalCount') or 0)
+    patents = []
+    for item in root.iter('item'):
+        patent = {}
+        for tag, key in ITEM_FIELDS.items():
+            value = item.findtext(tag)
+            if value:
+                patent[key] = value.strip()
+        patents.append(patent)
+    return total, patents
+
+
+class KiprisFetcher:
+    """KIPRIS 검색 결과를 페이지 단위로 동시에 가져오는 수집기
+
+    keep-alive ``requests.Session`` 하나를 풀 크기 ``max_workers``로 공유하고,
+    첫 페이지로 전체 건수를 확인한 뒤 나머지 페이지를 스레드 풀에서 동시에 요청한다.
+    실패한 요청은 tenacity로 지수 백오프 재시도하고, 모든 요청은 공용 RateLimiter를 거친다.
+    진행률 콜백은 호출한 스레드에서 불리므로 Streamlit 위젯을 바로 갱신해도 된다.
+    """
+
+    def __init__(self, api_key, base_url=KIPRIS_SEARCH_URL, page_size=PAGE_SIZE,
+                 max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @retry(
+        retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout, RetryableResponse)),
+        wait=wait_exponential(multiplier=0.5, max=8),
+        stop=stop_after_attempt(4),
+        reraise=True,
+    )
+    def fetch_page(self, params, page_no):
+        """한 페이지 요청 → (전체 건수, 특허 리스트)"""
+        self.rate_limiter.wait()
+        response = self.session.get(
+            self.base_url,
+            params={**params, 'ServiceKey': self.api_key, 'numOfRows': self.page_size, 'pageNo': page_no},
+            timeout=REQUEST_TIMEOUT,
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableResponse(f"KIPRIS {response.status_code}")
+        response.raise_for_status()
+        return parse_page(response.text)
+
+    def search(self, query, fields, max_results, progress=None):
+        """검색어로 최대 max_results건 수집
+
+        fields가 비어 있으면 전체 검색(word), 아니면 각 필드를 요청 파라미터로 사용한다.
+        progress(완료 페이지 수, 전체 페이지 수)는 페이지가 끝날 때마다 호출된다.
+        """
+        params = {field: query for field in fields} if fields else {'word': query}
+
+        total, patents = self.fetch_page(params, 1)
+        total_pages = max(1, math.ceil(min(total, max_results) / self.page_size))
+        if progress:
+            progress(1, total_pages)
+
+        pages = {1: patents}
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kipris') as executor:
+                futures = {
+                    executor.submit(self.fetch_page, params, page_no): page_no
+                    for page_no in range(2, total_pages + 1)
+                }
+                for done, future in enumerate(as_completed(futures), start=2):
+                    pages[futures[future]] = future.result()[1]
+                    if progress:
+                        progress(done, total_pages)
+
+        results = [patent for page_no in sorted(pages) for patent in pages[page_no]]
+        return results[:max_results]
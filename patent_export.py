@@ -0,0 +1,121 @@
+"""
+특허 목록 대량 내보내기 - CSV / JSON Lines / Parquet를 청크 단위 generator로 생성해 메모리 사용량 일정
+"""
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from patent_table import CATEGORY_COLUMNS, PATENT_COLUMNS, patent_records
+
+EXPORT_DIR = os.path.join('.cache', 'exports')
+EXPORT_CHUNK_ROWS = 1000  # 한 번에 변환할 행 수 (Parquet은 row group 크기)
+PARQUET_COMPRESSION = 'zstd'
+
+# 화면 표시 이름 -> (확장자, MIME)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'JSON Lines': ('jsonl', 'application/x-ndjson'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _chunks(table, chunk_rows):
+    for start in range(0, len(table), chunk_rows):
+        yield table.iloc[start:start + chunk_rows]
+
+
+def _csv_chunks(table, chunk_rows):
+    # 엑셀에서 한글이 깨지지 않도록 BOM은 맨 앞에 한 번만
+    yield '\ufeff'.encode()
+    header = True
+    for chunk in _chunks(table, chunk_rows):
+        chunk = chunk.assign(app_date=chunk['app_date'].dt.strftime('%Y-%m-%d'))
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+    if header:
+        yield pd.DataFrame(columns=PATENT_COLUMNS).to_csv(index=False).encode()
+
+
+def _jsonl_chunks(table, chunk_rows):
+    for chunk in _chunks(table, chunk_rows):
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in patent_records(chunk)).encode()
+
+
+# 카테고리 컬럼은 Parquet 사전 인코딩으로, 나머지는 문자열/날짜로 고정 - 청크마다 스키마가 같도록
+PARQUET_SCHEMA = pa.schema([
+    (column, pa.dictionary(pa.int32(), pa.string()) if column in CATEGORY_COLUMNS else
+     pa.timestamp('ms') if column == 'app_date' else pa.string())
+    for column in PATENT_COLUMNS
+])
+
+
+class _ChunkSink:
+    """ParquetWriter 출력을 모아 두었다가 generator가 꺼내 가는 쓰기 전용 파일 객체"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _arrow_chunk(chunk):
+    for column in CATEGORY_COLUMNS:
+        if chunk[column].cat.categories.dtype != object:
+            # 값이 전부 비어 있으면 카테고리가 float이라 문자열 사전과 맞지 않음
+            chunk = chunk.assign(**{column: chunk[column].cat.set_categories(pd.Index([], dtype=object))})
+    return pa.Table.from_pandas(chunk[PATENT_COLUMNS], schema=PARQUET_SCHEMA, preserve_index=False)
+
+
+def _parquet_chunks(table, chunk_rows):
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, PARQUET_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+        for chunk in _chunks(table, chunk_rows):
+            writer.write_table(_arrow_chunk(chunk), row_group_size=chunk_rows)
+            yield sink.drain()
+    yield sink.drain()  # footer
+
+
+_WRITERS = {'csv': _csv_chunks, 'jsonl': _jsonl_chunks, 'parquet': _parquet_chunks}
+
+
+def export_chunks(table, export_format, chunk_rows=EXPORT_CHUNK_ROWS):
+    """특허 테이블을 내보내기 형식의 바이트 조각으로 yield (EXPORT_FORMATS의 키)"""
+    extension, _ = EXPORT_FORMATS[export_format]
+    return _WRITERS[extension](table, chunk_rows)
+
+
+def write_export(table, export_format, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """조각을 받는 대로 파일에 기록 - 전체 내용을 메모리에 만들지 않음"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for data in export_chunks(table, export_format, chunk_rows):
+            f.write(data)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,194 @@
+"""
+검색 결과 내 전문 검색 - 제목/초록/출원인/발명자 역색인 (한글 2글자 n-gram) + BM25 순위 + 하이라이트
+"""
+
+import copy
+import math
+import re
+import threading
+import unicodedata
+import weakref
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# 필드별 가중치 (단어 빈도에 곱함) - 제목에 나온 단어를 더 중요하게
+FIELD_WEIGHTS = {'title': 2.0, 'abstract': 1.0, 'applicant': 1.0, 'inventor': 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r'\w+')
+
+
+def _normalize(text):
+    return unicodedata.normalize('NFC', text).lower()
+
+
+def tokenize(text):
+    """글자 2-gram 토큰 - 띄어쓰기/조사와 관계없이 한글 부분 일치가 되도록 (1글자 단어는 그대로)"""
+    tokens = []
+    for word in _WORD.findall(_normalize(text)):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class PatentIndex:
+    """특허 테이블 한 개에 대한 역색인
+
+    단어(2-gram)마다 (행 번호 배열, 가중 빈도 배열)을 numpy로 보관한다.
+    ``search``는 검색어의 모든 단어를 포함하는 행만 골라 BM25 점수순으로 돌려주며,
+    행 번호는 테이블의 위치(``iloc``) 기준이다.
+    """
+
+    def __init__(self, table):
+        self.postings = {}
+        self.lengths = np.zeros(0, dtype=np.float64)
+        self._append(table)
+
+    def _append(self, table):
+        """table 행을 현재 색인 뒤(행 번호 len(self)부터)에 추가"""
+        offset = len(self.lengths)
+        postings = defaultdict(list)
+        lengths = np.zeros(len(table), dtype=np.float64)
+        columns = [(table[field].to_numpy(), weight) for field, weight in FIELD_WEIGHTS.items()]
+        for row in range(len(table)):
+            counts = Counter()
+            for values, weight in columns:
+                value = values[row]
+                if isinstance(value, str):
+                    for token in tokenize(value):
+                        counts[token] += weight
+            lengths[row] = sum(counts.values())
+            for token, count in counts.items():
+                postings[token].append((offset + row, count))
+
+        for token, entries in postings.items():
+            rows = np.array([row for row, _ in entries], dtype=np.int64)
+            counts = np.array([count for _, count in entries], dtype=np.float64)
+            if token in self.postings:
+                # 새 행 번호가 항상 더 크므로 이어 붙여도 정렬 유지
+                old_rows, old_counts = self.postings[token]
+                rows, counts = np.concatenate([old_rows, rows]), np.concatenate([old_counts, counts])
+            self.postings[token] = (rows, counts)
+        self.lengths = np.concatenate([self.lengths, lengths])
+        self.avg_length = self.lengths.mean() if len(self.lengths) and self.lengths.mean() > 0 else 1.0
+
+    def extended(self, table):
+        """table 행을 뒤에 붙인 새 색인 - 기존 색인은 다른 테이블과 공유될 수 있으므로 그대로 둠"""
+        index = copy.copy(self)
+        index.postings = dict(self.postings)  # 배열은 바꾸지 않고 새로 만들므로 얕은 복사로 충분
+        index._append(table)
+        return index
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _idf(self, doc_freq):
+        return math.log(1 + (len(self) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _single_char_postings(self, char):
+        """1글자 검색어는 그 글자가 들어간 모든 2-gram의 합집합으로 매칭"""
+        rows, counts = [], []
+        for token, (token_rows, token_counts) in self.postings.items():
+            if char in token:
+                rows.append(token_rows)
+                counts.append(token_counts)
+        if not rows:
+            return None
+        rows, counts = np.concatenate(rows), np.concatenate(counts)
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        return unique_rows, np.bincount(inverse, weights=counts)
+
+    def search(self, query, limit=None):
+        """검색어의 모든 단어를 포함하는 행 → [(행 번호, BM25 점수)] 점수 내림차순"""
+        terms = []
+        for token in set(tokenize(query)):
+            posting = self._single_char_postings(token) if len(token) == 1 else self.postings.get(token)
+            if posting is None:
+                return []
+            terms.append(posting)
+        if not terms:
+            return []
+
+        terms.sort(key=lambda posting: len(posting[0]))  # 희귀한 단어부터 교집합
+        candidates = terms[0][0]
+        for rows, _ in terms[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[candidates] / self.avg_length)
+        scores = np.zeros(len(candidates))
+        for rows, counts in terms:
+            tf = counts[np.searchsorted(rows, candidates)]
+            scores += self._idf(len(rows)) * tf * (BM25_K1 + 1) / (tf + norm)
+
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+
+def highlight(text, query):
+    """검색어 2-gram과 겹치는 부분을 배경색으로 강조한 Streamlit 마크다운
+
+    강조 구간은 항상 글자(\\w)로만 이루어지므로 ``[...]`` 문법이 깨지지 않고,
+    굵게 표시된 expander 제목 안에서도 쓸 수 있다.
+    """
+    if not text or not query:
+        return text
+    terms = set(tokenize(query))
+    normalized = _normalize(text)
+    if len(normalized) != len(text):
+        return text  # 정규화로 길이가 바뀌면 위치를 맞출 수 없음
+    marked = [False] * len(text)
+    for i in range(len(normalized)):
+        if i + 1 < len(text) and normalized[i:i + 2] in terms:
+            marked[i] = marked[i + 1] = True
+        elif normalized[i] in terms:
+            marked[i] = True
+
+    parts, start = [], 0
+    for i in range(1, len(text) + 1):
+        if i == len(text) or marked[i] != marked[start]:
+            segment = text[start:i]
+            parts.append(f":orange-background[{segment}]" if marked[start] else segment)
+            start = i
+    return ''.join(parts)
+
+
+_indexes = {}  # id(테이블) -> (약한 참조, PatentIndex)
+_lock = threading.RLock()  # 약한 참조 콜백(_forget)이 lock 보유 중 GC에서 불릴 수 있음
+
+
+def _remember(table, index):
+    with _lock:
+        _indexes[id(table)] = (weakref.ref(table, lambda _, key=id(table): _forget(key)), index)
+
+
+def index_for(table):
+    """테이블별 색인 (한 번만 생성) - 검색 캐시가 테이블을 세션 간 공유하므로 색인도 함께 공유됨"""
+    with _lock:
+        entry = _indexes.get(id(table))
+        if entry is not None and entry[0]() is table:
+            return entry[1]
+    index = PatentIndex(table)
+    _remember(table, index)
+    return index
+
+
+def extend_index(table, base_table, new_rows):
+    """table = base_table + new_rows일 때 base_table 색인이 있으면 새 행만 추가 색인
+
+    base_table 색인이 없으면 아무것도 하지 않는다 (필요할 때 index_for가 새로 만듦).
+    """
+    with _lock:
+        entry = _indexes.get(id(base_table))
+    if entry is not None and entry[0]() is base_table and table is not base_table:
+        _remember(table, entry[1].extended(new_rows))
+
+
+def _forget(key):
+    with _lock:
+        _indexes.pop(key, None)
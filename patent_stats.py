@@ -0,0 +1,109 @@
+"""
+특허 통계 증분 엔진 - 특허가 추가/삭제될 때 집계만 갱신하고 요약은 미리 계산해 둠
+"""
+
+import heapq
+from collections import Counter
+
+import numpy as np
+
+from applicant_index import ApplicantIndex
+from patent_table import RECENT_YEAR, registered_mask
+
+YEAR_BASE = 1900  # 연도 히스토그램 배열의 0번 칸
+TOP_APPLICANTS = 10
+
+
+def _value_counts(column, missing):
+    """배치 하나의 값별 건수 - 고유값 단위로만 루프"""
+    counts = column.value_counts(dropna=False)
+    result = Counter()
+    for key, value in counts[counts > 0].items():
+        result[missing if key != key else str(key)] += int(value)  # NaN != NaN
+    return result
+
+
+class PatentStats:
+    """출원인/연도/등록상태 집계를 증분으로 유지
+
+    ``add``/``remove``는 새로 들어오거나 빠지는 행만 벡터 연산으로 집계한다.
+    연도는 ``np.bincount`` 히스토그램, 상위 출원인은 힙(``heapq.nlargest``)으로
+    구하며, 요약은 변경 시 한 번만 만들어 두므로 ``summary()``는 O(1).
+    고유 출원인 수는 표기 차이((주)/주식회사, 공백 등)를 합친 ``ApplicantIndex`` 기준이다.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.registered = 0
+        self.applicants = Counter()
+        self.applicant_index = ApplicantIndex()
+        self.statuses = Counter()
+        self.year_histogram = np.zeros(0, dtype=np.int64)
+        self._summary = None
+
+    @classmethod
+    def from_table(cls, table):
+        stats = cls()
+        stats.add(table)
+        return stats
+
+    def _batch(self, table):
+        """배치 집계: (건수, 등록 건수, 출원인 Counter, 상태 Counter, 연도 히스토그램)"""
+        years = table['app_date'].dt.year.dropna().astype(np.int64).to_numpy() - YEAR_BASE
+        years = years[years >= 0]
+        histogram = np.bincount(years, minlength=len(self.year_histogram)) if len(years) else \
+            np.zeros(len(self.year_histogram), dtype=np.int64)
+        return (
+            len(table),
+            int(registered_mask(table).sum()),
+            _value_counts(table['applicant'], '정보없음'),
+            _value_counts(table['reg_status'], '출원'),
+            histogram,
+        )
+
+    def _resize_histogram(self, length):
+        if length > len(self.year_histogram):
+            self.year_histogram = np.pad(self.year_histogram, (0, length - len(self.year_histogram)))
+
+    def add(self, table):
+        """새로 들어온 특허(테이블 행)를 집계에 반영"""
+        total, registered, applicants, statuses, histogram = self._batch(table)
+        self.total += total
+        self.registered += registered
+        self.applicants.update(applicants)
+        self.applicant_index.add(applicants)
+        self.statuses.update(statuses)
+        self._resize_histogram(len(histogram))
+        self.year_histogram[:len(histogram)] += histogram
+        self._summary = None
+
+    def remove(self, table):
+        """빠진 특허(테이블 행)를 집계에서 제외"""
+        total, registered, applicants, statuses, histogram = self._batch(table)
+        self.total -= total
+        self.registered -= registered
+        self.applicants.subtract(applicants)
+        self.applicant_index.remove(applicants)
+        self.statuses.subtract(statuses)
+        self.year_histogram[:len(histogram)] -= histogram
+        # 0이 된 항목은 지워서 고유 출원인 수가 맞도록
+        self.applicants = +self.applicants
+        self.statuses = +self.statuses
+        self._summary = None
+
+    def summary(self):
+        """메트릭/차트/PDF가 쓰는 요약 (변경 후 첫 호출에서만 계산)"""
+        if self._summary is None:
+            years = np.nonzero(self.year_histogram)[0]
+            recent = int(self.year_histogram[max(RECENT_YEAR - YEAR_BASE, 0):].sum())
+            self._summary = {
+                'total': self.total,
+                'unique_applicants': len(self.applicant_index) - (1 if '정보없음' in self.applicants else 0),
+                'registered': self.registered,
+                'registered_ratio': self.registered / self.total * 100 if self.total else 0.0,
+                'recent_ratio': recent / self.total * 100 if self.total else 0.0,
+                'top_applicants': dict(heapq.nlargest(TOP_APPLICANTS, self.applicants.items(), key=lambda x: x[1])),
+                'yearly_trends': {str(YEAR_BASE + year): int(self.year_histogram[year]) for year in years},
+                'status_distribution': dict(self.statuses.most_common()),
+            }
+        return self._summary
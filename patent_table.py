@@ -0,0 +1,90 @@
+"""
+특허 검색 결과 컬럼형 테이블 - dict 리스트 대신 타입이 지정된 pandas DataFrame
+"""
+
+import pandas as pd
+
+# 검색 결과 dict의 키 = 테이블 컬럼
+PATENT_COLUMNS = [
+    'app_num', 'title', 'applicant', 'inventor', 'app_date',
+    'reg_status', 'abstract', 'kipris_url', 'source_query',
+]
+# 값 종류가 적은 컬럼은 category(사전 인코딩)로 저장해 메모리 절약
+CATEGORY_COLUMNS = ['applicant', 'reg_status', 'source_query']
+RECENT_YEAR = 2020
+
+
+def _parse_dates(values):
+    """'20230115', '2023.01.15', '2023-01-15' 등 KIPRIS 날짜 문자열을 날짜로 변환 (실패 시 NaT)"""
+    digits = pd.Series(values, dtype='string').str.replace(r'\D', '', regex=True)
+    return pd.to_datetime(digits.str[:8], format='%Y%m%d', errors='coerce')
+
+
+def to_patent_table(patents):
+    """검색 결과(dict 리스트)를 컬럼형 테이블로 변환"""
+    table = pd.DataFrame.from_records(list(patents), columns=PATENT_COLUMNS)
+    for column in PATENT_COLUMNS:
+        if column == 'app_date':
+            table[column] = _parse_dates(table[column])
+        elif column in CATEGORY_COLUMNS:
+            table[column] = table[column].astype('category')
+        else:
+            table[column] = table[column].astype(object)  # 값이 전부 비어도 float이 되지 않도록
+    return table.reset_index(drop=True)
+
+
+def patent_records(table):
+    """테이블(또는 그 일부)을 화면 표시/AI 분석용 dict 리스트로 변환 - 한 페이지 분량만 변환할 것"""
+    records = table.astype(object).where(table.notna(), None)
+    records['app_date'] = table['app_date'].dt.strftime('%Y-%m-%d').astype(object).where(table['app_date'].notna(), None)
+    return [
+        {key: value for key, value in record.items() if value is not None}
+        for record in records.to_dict('records')
+    ]
+
+
+def registered_mask(table):
+    """등록상태에 '등록'이 들어간 행 - 문자열 비교는 행이 아닌 카테고리 수만큼만 수행"""
+    statuses = table['reg_status']
+    categories = statuses.cat.categories
+    # 등록상태가 전부 비어 있으면 카테고리가 float 빈 Index라 .str을 못 씀
+    registered_categories = categories[categories.astype(str).str.contains('등록')]
+    return statuses.isin(registered_categories)
+
+
+def normalize_app_num(app_num):
+    """중복 판별용 출원번호 - 하이픈 제거 ('10-2023-0123456' → '1020230123456')"""
+    return app_num.replace('-', '').strip() if isinstance(app_num, str) else ''
+
+
+def merge_patent_tables(table, new_table, known_keys, source_query):
+    """new_table 중 처음 보는 특허만 table 뒤에 붙임 → (합친 테이블, 추가된 행)
+
+    known_keys는 table에 이미 있는 정규화 출원번호 집합으로, 추가된 특허의 번호가
+    제자리에서 더해진다. 추가된 행에는 source_query(가져온 검색어)를 기록한다.
+    출원번호가 없는 특허는 비교할 수 없으므로 항상 추가한다.
+
+    table이 비어 있고 new_table 전체가 그대로 추가되며 source_query까지 이미 같으면
+    복사하지 않고 new_table을 그대로 돌려준다 - 검색 캐시의 테이블과 그 색인을 세션 간 공유.
+    """
+    keys = new_table['app_num'].map(normalize_app_num)
+    fresh = ~keys.isin(known_keys) & (~keys.duplicated() | keys.eq(''))
+    if table.empty and fresh.all() and new_table['source_query'].eq(source_query).all():
+        known_keys.update(key for key in keys if key)
+        return new_table, new_table
+    new_rows = new_table[fresh.to_numpy()].assign(source_query=source_query)
+    new_rows['source_query'] = new_rows['source_query'].astype('category')
+    known_keys.update(key for key in keys[fresh] if key)
+
+    if new_rows.empty:
+        return table, new_rows.reset_index(drop=True)
+
+    # 컬럼별로 이어 붙임 - 카테고리 컬럼은 양쪽 카테고리를 합쳐 다시 category로
+    merged = pd.DataFrame({
+        column: pd.concat([table[column].astype(object), new_rows[column].astype(object)],
+                          ignore_index=True).astype('category')
+        if column in CATEGORY_COLUMNS else
+        pd.concat([table[column], new_rows[column]], ignore_index=True)
+        for column in PATENT_COLUMNS
+    })
+    return merged, new_rows.reset_index(drop=True)
@@ -0,0 +1,93 @@
+"""
+PDF 보고서 캐시 - 분석이 끝나면 백그라운드에서 미리 생성, 보고서 데이터 + 분석 내용 해시로 디스크에 보관
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+REPORT_CACHE_DIR = os.path.join('.cache', 'reports')
+REPORT_CACHE_SIZE = 64  # 디스크에 보관할 PDF 개수
+REPORT_VERSION = 1  # 보고서 양식을 바꾸면 올려서 기존 캐시 무효화
+
+
+def report_key(pdf_data, analysis_text):
+    payload = json.dumps(
+        {'version': REPORT_VERSION, 'pdf_data': pdf_data, 'analysis': analysis_text},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PdfReports:
+    """``analyzer.generate_pdf_report`` 결과를 파일로 캐시
+
+    ``submit``은 같은 내용의 보고서가 이미 있거나 생성 중이면 그것을 돌려주므로
+    분석 완료 시 미리 요청해 두고, 다운로드할 때 다시 요청해 완료를 기다리면 된다.
+    생성된 PDF는 메모리에 들고 있지 않고 파일 경로만 넘긴다.
+    """
+
+    def __init__(self, cache_dir=REPORT_CACHE_DIR, max_entries=REPORT_CACHE_SIZE, workers=1):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-report')
+        self._pending = {}  # key -> Future (생성 중)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def path(self, pdf_data, analysis_text):
+        """이미 생성된 보고서 파일 경로 (없으면 None)"""
+        path = self._path(report_key(pdf_data, analysis_text))
+        try:
+            os.utime(path)  # LRU 순서 갱신
+        except OSError:
+            return None
+        return path
+
+    def submit(self, analyzer, pdf_data, analysis_text):
+        """보고서 생성 요청 → 파일 경로를 돌려줄 Future"""
+        path = self.path(pdf_data, analysis_text)
+        if path is not None:
+            future = Future()
+            future.set_result(path)
+            return future
+        key = report_key(pdf_data, analysis_text)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._build, key, analyzer, pdf_data, analysis_text)
+            self._pending[key] = future
+        # 이미 끝난 Future면 콜백이 바로 이 스레드에서 불리므로 lock 밖에서 등록
+        future.add_done_callback(lambda _: self._finish(key))
+        return future
+
+    def _build(self, key, analyzer, pdf_data, analysis_text):
+        buffer = analyzer.generate_pdf_report(pdf_data, analysis_text)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getbuffer())  # BytesIO 내용을 복사하지 않고 바로 기록
+        os.replace(tmp_path, path)
+        self._trim()
+        return path
+
+    def _trim(self):
+        """오래 안 쓴 보고서부터 정리"""
+        try:
+            files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.pdf')]
+            if len(files) > self.max_entries:
+                files.sort(key=os.path.getmtime)
+                for old_path in files[:len(files) - self.max_entries]:
+                    os.remove(old_path)
+        except OSError:
+            pass
+
+    def _finish(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
@@ -0,0 +1,820 @@
+"""Storage backends for the image bulletin board posts."""
+import bisect
+import json
+import os
+import sqlite3
+import stat
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# --- Configuration ---
+COMPACT_EVERY = 500  # Log records to accumulate before compacting in the background
+ID_BLOCK_SIZE = 32  # Post IDs each process leases from the shared sequence at a time
+
+
+def _read_json_list(path):
+    """Reads a JSON array from disk, treating a missing or broken file as empty."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return []
+
+
+def _fsync_dir(path):
+    """Makes a rename inside ``path``'s directory durable."""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _open_temp(path):
+    """Opens a per-thread temp file next to ``path`` for an atomic replace; returns (file, temp path).
+
+    A new file gets the umask default mode, as with ``open``; if ``path``
+    exists its mode is copied, so swapping the temp file in never changes the
+    permissions (``tempfile.mkstemp`` would always create 0600 files).
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+        pass
+    except BaseException:
+        os.close(fd)
+        raise
+    return os.fdopen(fd, 'w'), tmp_path
+
+
+def _write_json_list(path, posts):
+    """Writes a JSON array to a unique temp file, fsyncs it and swaps it into place.
+
+    Readers see either the old or the new document, never a truncated one.
+    """
+    f, tmp_path = _open_temp(path)
+    try:
+        with f:
+            json.dump(posts, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(path)
+
+
+class FileLock:
+    """Exclusive advisory lock shared by threads and processes.
+
+    The lock file is reopened on every acquisition, so ``flock`` also excludes
+    other threads of the same process. Where ``fcntl`` is unavailable only the
+    in-process lock is taken.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            try:
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            # Closing the file drops the flock.
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+class GroupCommit:
+    """Merges concurrent writes into batches that share one flush.
+
+    ``submit`` blocks until its item has been flushed. The first caller to find
+    no flush in progress becomes the leader and flushes everything queued so
+    far; callers arriving meanwhile queue up for the leader's next round, so a
+    burst of N writes costs a handful of fsyncs instead of N. ``flush`` may
+    return one result per item, which ``submit`` hands back to its caller.
+    """
+
+    def __init__(self, flush):
+        self._flush = flush
+        self._cond = threading.Condition()
+        self._pending = []
+        self._flushing = False
+
+    def submit(self, item):
+        ticket = {'item': item, 'done': False, 'error': None, 'result': None}
+        with self._cond:
+            self._pending.append(ticket)
+            if self._flushing:
+                while not ticket['done']:
+                    self._cond.wait()
+            else:
+                self._flushing = True
+                try:
+                    while self._pending:
+                        batch, self._pending = self._pending, []
+                        self._cond.release()
+                        try:
+                            results = self._flush([t['item'] for t in batch])
+                            if results is not None:
+                                for t, result in zip(batch, results):
+                                    t['result'] = result
+                        except Exception as e:
+                            for t in batch:
+                                t['error'] = e
+                        finally:
+                            self._cond.acquire()
+                        for t in batch:
+                            t['done'] = True
+                        self._cond.notify_all()
+                finally:
+                    self._flushing = False
+        if ticket['error'] is not None:
+            raise ticket['error']
+        return ticket['result']
+
+
+def _feed_key(post):
+    """Orders the feed by timestamp, breaking ties by ID so cursors are unambiguous."""
+    return (post['timestamp'], post['id'])
+
+
+def _page_from_sorted(oldest_first, keys, before, limit):
+    """Returns one newest-first page of an oldest-first list and the cursor for the next one.
+
+    ``keys`` holds ``_feed_key`` of every post in ``oldest_first``; ``before`` is
+    the cursor returned for the previous page (None for the newest page).
+    """
+    end = len(keys) if before is None else bisect.bisect_left(keys, tuple(before))
+    start = max(end - limit, 0)
+    page = oldest_first[start:end][::-1]
+    next_cursor = keys[start] if start > 0 else None
+    return page, next_cursor
+
+
+def _apply_ops(posts, ops):
+    """Applies ("put", post) / ("update", post) / ("delete", id) operations to a list of posts.
+
+    "update" only replaces an existing post, like SQL UPDATE; it does not bring
+    back a post that was deleted meanwhile. Returns the new list and, for each
+    operation, the post it replaced or removed (None if there was none).
+    """
+    posts_by_id = {p['id']: p for p in posts}
+    previous = []
+    for op, value in ops:
+        if op == 'put':
+            previous.append(posts_by_id.get(value['id']))
+            posts_by_id[value['id']] = value
+        elif op == 'update':
+            previous.append(posts_by_id.get(value['id']))
+            if value['id'] in posts_by_id:
+                posts_by_id[value['id']] = value
+        elif op == 'delete':
+            previous.append(posts_by_id.pop(value, None))
+    return list(posts_by_id.values()), previous
+
+
+class JsonPostStorage:
+    """Keeps every post in a single JSON document (the original posts.json format).
+
+    Every mutation rewrites the whole file, so it is only suitable for small
+    boards. Writers from any process serialize on ``<path>.lock`` and re-read
+    the file inside the lock, so concurrent posts are never lost.
+    """
+
+    indexed = False  # get/page parse the whole file
+
+    def __init__(self, path):
+        self.path = path
+        self._file_lock = FileLock(f"{path}.lock")
+        self._commits = GroupCommit(self._flush)
+
+    def files(self):
+        """Returns the paths whose contents make up the stored posts."""
+        return [self.path]
+
+    def load(self):
+        """Returns all posts in insertion order."""
+        return _read_json_list(self.path)
+
+    def get(self, post_id):
+        return next((p for p in self.load() if p['id'] == post_id), None)
+
+    def newest_first(self):
+        return sorted(self.load(), key=_feed_key, reverse=True)
+
+    def page(self, before=None, limit=20):
+        oldest_first = sorted(self.load(), key=_feed_key)
+        return _page_from_sorted(oldest_first, [_feed_key(p) for p in oldest_first], before, limit)
+
+    def _flush(self, ops):
+        with self._file_lock:
+            posts, previous = _apply_ops(self.load(), ops)
+            _write_json_list(self.path, posts)
+        return previous
+
+    def save(self, posts):
+        """Replaces the stored posts with the given list."""
+        with self._file_lock:
+            _write_json_list(self.path, posts)
+
+    def create(self, post):
+        self._commits.submit(('put', post))
+
+    def update(self, post):
+        """Replaces the post with the same ID and returns the previous version.
+
+        Returns None and stores nothing if no post has that ID.
+        """
+        return self._commits.submit(('update', post))
+
+    def delete(self, post_id):
+        """Removes a post and returns it (None if it was already gone)."""
+        return self._commits.submit(('delete', post_id))
+
+
+class WalPostStorage:
+    """Append-only write-ahead log on top of a JSON snapshot.
+
+    Each mutation appends one JSON-lines record to ``<path>.wal`` instead of
+    rewriting the snapshot, so a write costs O(1) bytes. Records carry the full
+    post ("put") or just its id ("delete"), which makes replaying them
+    idempotent. Concurrent appends are group-committed behind one fsync, and
+    all processes serialize log writes, rotation and snapshot swaps on
+    ``<path>.lock``. Once the log grows past ``compact_every`` records it is
+    rotated and folded into the snapshot on a background thread.
+
+    Each process keeps the posts it last rebuilt, keyed by the snapshot and log
+    versions it was built from. While only appends happened since, reads and
+    writes replay just the new tail of the log instead of the whole board.
+    """
+
+    indexed = False  # get/page replay the snapshot and the log
+
+    def __init__(self, path, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.log_path = f"{path}.wal"
+        self.compacting_path = f"{path}.wal.compacting"
+        self.compact_every = compact_every
+        self._file_lock = FileLock(f"{path}.lock")
+        self._commits = GroupCommit(self._flush)
+        self._compactor = None
+        self._state = None  # (snapshot signatures, log inode, log offset, posts_by_id); guarded by the file lock
+
+    # --- Reading ---
+    @staticmethod
+    def _count_records(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    @staticmethod
+    def _replay(posts_by_id, log_path):
+        """Applies the records of one log file to ``posts_by_id`` in place."""
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append; everything before it is intact.
+                    continue
+                if record['op'] == 'put':
+                    posts_by_id[record['post']['id']] = record['post']
+                elif record['op'] == 'delete':
+                    posts_by_id.pop(record['id'], None)
+
+    @staticmethod
+    def _replay_tail(posts_by_id, log_path, offset):
+        """Applies the complete records after byte ``offset`` and returns the offset past them.
+
+        A partial last line (a crash mid-append) is not consumed;
+        ``_truncate_torn_tail`` cuts it off before the next append.
+        """
+        try:
+            f = open(log_path, 'rb')
+        except FileNotFoundError:
+            return offset
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A torn line from before torn tails were truncated.
+                if record['op'] == 'put':
+                    posts_by_id[record['post']['id']] = record['post']
+                elif record['op'] == 'delete':
+                    posts_by_id.pop(record['id'], None)
+        return offset
+
+    def _current(self):
+        """Returns the current posts by ID, replaying only what was appended since the last call.
+
+        The snapshot and the rotated log change only on compaction or ``save``,
+        and the live log only grows in between; any other change triggers a full
+        rebuild. Must be called with the file lock held; the returned dict is
+        shared and must not be modified.
+        """
+        snapshots = (_stat_signature(self.path), _stat_signature(self.compacting_path))
+        try:
+            log_stat = os.stat(self.log_path)
+            log_inode, log_size = log_stat.st_ino, log_stat.st_size
+        except FileNotFoundError:
+            log_inode, log_size = None, 0
+        state = self._state
+        if state is not None and state[0] == snapshots and state[1] == log_inode and state[2] <= log_size:
+            _, _, offset, posts_by_id = state
+        else:
+            posts_by_id = {p['id']: p for p in _read_json_list(self.path)}
+            # Older records first: a rotated log that is still being compacted, then the live log.
+            self._replay(posts_by_id, self.compacting_path)
+            offset = 0
+        offset = self._replay_tail(posts_by_id, self.log_path, offset)
+        self._state = (snapshots, log_inode, offset, posts_by_id)
+        return posts_by_id
+
+    def files(self):
+        """Returns the paths whose contents make up the stored posts."""
+        return [self.path, self.compacting_path, self.log_path]
+
+    def load(self):
+        """Returns the current posts from the snapshot plus the log."""
+        with self._file_lock:
+            return list(self._current().values())
+
+    def get(self, post_id):
+        with self._file_lock:
+            return self._current().get(post_id)
+
+    def newest_first(self):
+        return sorted(self.load(), key=_feed_key, reverse=True)
+
+    def page(self, before=None, limit=20):
+        oldest_first = sorted(self.load(), key=_feed_key)
+        return _page_from_sorted(oldest_first, [_feed_key(p) for p in oldest_first], before, limit)
+
+    # --- Writing ---
+    @staticmethod
+    def _truncate_torn_tail(log_path):
+        """Cuts off a partial last line left by a crash mid-append.
+
+        Without this the next append would be glued onto the fragment and replay
+        would skip the merged line, losing a committed record. Must be called with
+        the file lock held.
+        """
+        try:
+            f = open(log_path, 'r+b')
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            # Scan backwards for the end of the last complete record.
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _flush(self, items):
+        """Appends ``(kind, record)`` items to the log; ``kind`` is "create", "update" or "delete".
+
+        Updates and deletes report the post they replaced or removed, which is
+        read under the same lock as the append so that two writers can never
+        both see it. An update of a post that no longer exists is dropped, like
+        SQL UPDATE. Batches of plain creates skip the lookup.
+        """
+        previous = [None] * len(items)
+        records = [record for _, record in items]
+        with self._file_lock:
+            if any(kind != 'create' for kind, _ in items):
+                posts_by_id = self._current()
+                batch = {}  # Posts written earlier in this batch; the shared dict is left alone
+                records = []
+                for i, (kind, record) in enumerate(items):
+                    post_id = record['post']['id'] if record['op'] == 'put' else record['id']
+                    old = batch[post_id] if post_id in batch else posts_by_id.get(post_id)
+                    if kind == 'update' and old is None:
+                        continue
+                    batch[post_id] = record['post'] if record['op'] == 'put' else None
+                    if kind != 'create':
+                        previous[i] = old
+                    records.append(record)
+            if records:
+                self._truncate_torn_tail(self.log_path)
+                with open(self.log_path, 'a') as f:
+                    f.write(''.join(json.dumps(record) + '\n' for record in records))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Other processes append too, so the log length is the source of truth.
+                if self._count_records(self.log_path) >= self.compact_every:
+                    self._start_compaction()
+        return previous
+
+    def create(self, post):
+        self._commits.submit(('create', {'op': 'put', 'post': post}))
+
+    def update(self, post):
+        """Replaces the post with the same ID and returns the previous version.
+
+        Returns None and stores nothing if no post has that ID.
+        """
+        return self._commits.submit(('update', {'op': 'put', 'post': post}))
+
+    def delete(self, post_id):
+        """Removes a post and returns it (None if it was already gone)."""
+        return self._commits.submit(('delete', {'op': 'delete', 'id': post_id}))
+
+    def save(self, posts):
+        """Replaces the stored posts with the given list and empties the log."""
+        with self._file_lock:
+            _write_json_list(self.path, posts)
+            for log_path in (self.compacting_path, self.log_path):
+                if os.path.exists(log_path):
+                    os.remove(log_path)
+
+    # --- Compaction ---
+    def _start_compaction(self):
+        """Rotates the live log and folds it into the snapshot on a worker thread.
+
+        Must be called with the file lock held.
+        """
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        # If a previous compaction did not finish, the worker retries that log first
+        # and the live log keeps growing until the next rotation.
+        if not os.path.exists(self.compacting_path):
+            os.replace(self.log_path, self.compacting_path)
+        self._compactor = threading.Thread(target=self.compact, daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """Writes a fresh snapshot that includes the rotated log, then drops the log.
+
+        The snapshot is rebuilt inside the file lock so that a compaction started
+        by another process cannot be overwritten with stale data; appends wait
+        for it, but request threads never run it themselves.
+        """
+        with self._file_lock:
+            if not os.path.exists(self.compacting_path):
+                return  # Another process already folded it in.
+            posts_by_id = {p['id']: p for p in _read_json_list(self.path)}
+            self._replay(posts_by_id, self.compacting_path)
+            _write_json_list(self.path, list(posts_by_id.values()))
+            os.remove(self.compacting_path)
+
+
+class SqlitePostStorage:
+    """Stores posts in SQLite (WAL journal mode) with indexed CRUD paths.
+
+    ``id`` is the primary key and ``timestamp`` is indexed, so lookups,
+    deletes and newest-first listing never scan the whole board. Keys outside
+    the core post schema are kept in a JSON ``extra`` column. On first use an
+    existing JSON board next to the database is imported.
+    """
+
+    indexed = True  # get/page are index lookups, cheaper than reloading the board after a write
+    COLUMNS = ('id', 'author', 'title', 'content', 'timestamp', 'image_path')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY,
+            author TEXT,
+            title TEXT,
+            content TEXT,
+            timestamp TEXT NOT NULL,
+            image_path TEXT,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS posts_timestamp ON posts (timestamp, id);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+    # Parameterized statements are compiled once and reused from the connection's statement cache.
+    SELECT_ALL = "SELECT id, author, title, content, timestamp, image_path, extra FROM posts ORDER BY rowid"
+    SELECT_ONE = "SELECT id, author, title, content, timestamp, image_path, extra FROM posts WHERE id = ?"
+    SELECT_NEWEST = ("SELECT id, author, title, content, timestamp, image_path, extra FROM posts "
+                     "ORDER BY timestamp DESC, id DESC")
+    # Keyset pagination: seeks the (timestamp, id) index to the cursor instead of skipping rows with OFFSET.
+    SELECT_PAGE_FIRST = ("SELECT id, author, title, content, timestamp, image_path, extra FROM posts "
+                         "ORDER BY timestamp DESC, id DESC LIMIT ?")
+    SELECT_PAGE_BEFORE = ("SELECT id, author, title, content, timestamp, image_path, extra FROM posts "
+                          "WHERE (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC LIMIT ?")
+    INSERT = ("INSERT INTO posts (id, author, title, content, timestamp, image_path, extra) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+    UPDATE = ("UPDATE posts SET author = ?, title = ?, content = ?, timestamp = ?, image_path = ?, extra = ? "
+              "WHERE id = ?")
+    DELETE = "DELETE FROM posts WHERE id = ?"
+
+    def __init__(self, path, import_from=None):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(self.SCHEMA)
+        if import_from:
+            self._import_once(conn, import_from)
+
+    def _import_once(self, conn, import_from):
+        """Imports the JSON board the first time any process opens the database.
+
+        The import is recorded in ``meta``, so a board whose posts were all
+        deleted later stays empty. The check and the insert share one immediate
+        transaction, so workers starting together import exactly once.
+        """
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'imported_from'").fetchone() is None:
+                # Databases created before the marker existed only import if they are still empty.
+                if conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == 0:
+                    conn.executemany(self.INSERT, [self._to_row(p) for p in _read_json_list(import_from)])
+                conn.execute("INSERT INTO meta (key, value) VALUES ('imported_from', ?)", (import_from,))
+
+    def _connection(self):
+        """Returns this thread's connection; sqlite3 connections are not shared across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _to_row(self, post):
+        extra = {k: v for k, v in post.items() if k not in self.COLUMNS}
+        return tuple(post.get(k) for k in self.COLUMNS) + (json.dumps(extra) if extra else None,)
+
+    def _from_row(self, row):
+        post = dict(zip(self.COLUMNS, row[:-1]))
+        if row[-1]:
+            post.update(json.loads(row[-1]))
+        return post
+
+    def files(self):
+        """Returns the paths whose contents make up the stored posts."""
+        return [self.path, f"{self.path}-wal"]
+
+    def load(self):
+        """Returns all posts in insertion order."""
+        return [self._from_row(row) for row in self._connection().execute(self.SELECT_ALL)]
+
+    def get(self, post_id):
+        row = self._connection().execute(self.SELECT_ONE, (post_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def newest_first(self):
+        return [self._from_row(row) for row in self._connection().execute(self.SELECT_NEWEST)]
+
+    def page(self, before=None, limit=20):
+        # Fetch one extra row to learn whether an older page exists; only ``limit`` rows are decoded.
+        if before is None:
+            rows = self._connection().execute(self.SELECT_PAGE_FIRST, (limit + 1,)).fetchall()
+        else:
+            rows = self._connection().execute(self.SELECT_PAGE_BEFORE, (*before, limit + 1)).fetchall()
+        page = [self._from_row(row) for row in rows[:limit]]
+        next_cursor = _feed_key(page[-1]) if len(rows) > limit else None
+        return page, next_cursor
+
+    def save(self, posts):
+        """Replaces the stored posts with the given list."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM posts")
+            conn.executemany(self.INSERT, [self._to_row(p) for p in posts])
+
+    def create(self, post):
+        with self._connection() as conn:
+            conn.execute(self.INSERT, self._to_row(post))
+
+    def update(self, post):
+        """Replaces the post with the same ID and returns the previous version.
+
+        Returns None and stores nothing if no post has that ID.
+        """
+        row = self._to_row(post)
+        with self._connection() as conn:
+            # Take the write lock before reading so no other writer can change the row in between.
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute(self.SELECT_ONE, (post['id'],)).fetchone()
+            conn.execute(self.UPDATE, row[1:] + row[:1])
+        return self._from_row(old) if old else None
+
+    def delete(self, post_id):
+        """Removes a post and returns it (None if it was already gone)."""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute(self.SELECT_ONE, (post_id,)).fetchone()
+            conn.execute(self.DELETE, (post_id,))
+        return self._from_row(old) if old else None
+
+
+def _stat_signature(path):
+    """Identifies one version of a file without reading it."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class CachedPostStore:
+    """Shares one parsed copy of the posts between every session of the process.
+
+    The cached list is only reloaded when one of the backend's files changes
+    on disk (inode, size or mtime) or after a write made through this store.
+    Callers get the shared list back and must treat it and its posts as
+    read-only; copy a post before changing it and pass the copy to ``update``.
+
+    Backends with ``indexed`` set answer ``get`` and ``page`` themselves, so a
+    write does not force a full reload before the next feed page is shown.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._posts = []
+        self._by_id = {}
+        self._oldest_first = []
+        self._feed_keys = []
+        self._newest = []
+        self._signature = None
+
+    def _current_signature(self):
+        return tuple(_stat_signature(path) for path in self.storage.files())
+
+    def invalidate(self):
+        """Forces the next ``load`` to read from the backend."""
+        with self._lock:
+            self._signature = None
+
+    def _refresh(self):
+        """Reloads the posts and their derived views if the files changed.
+
+        Must be called with ``self._lock`` held.
+        """
+        signature = self._current_signature()
+        if signature != self._signature:
+            self._posts = self.storage.load()
+            self._by_id = {p['id']: p for p in self._posts}
+            self._oldest_first = sorted(self._posts, key=_feed_key)
+            self._feed_keys = [_feed_key(p) for p in self._oldest_first]
+            self._newest = self._oldest_first[::-1]
+            self._signature = signature
+
+    def load(self):
+        """Returns the cached posts, reloading them if the files changed."""
+        with self._lock:
+            self._refresh()
+            return self._posts
+
+    def get(self, post_id):
+        """Returns the cached post with ``post_id``, or None."""
+        if self.storage.indexed:
+            return self.storage.get(post_id)
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(post_id)
+
+    def newest_first(self):
+        """Returns the cached posts ordered newest first."""
+        with self._lock:
+            self._refresh()
+            return self._newest
+
+    def page(self, before=None, limit=20):
+        """Returns one newest-first page of cached posts and the cursor for the next one.
+
+        Pages are cut from the cached sorted list with a binary search, so the
+        cost does not depend on how many posts the board has.
+        """
+        if self.storage.indexed:
+            return self.storage.page(before, limit)
+        with self._lock:
+            self._refresh()
+            return _page_from_sorted(self._oldest_first, self._feed_keys, before, limit)
+
+    def create(self, post):
+        self.storage.create(post)
+        self.invalidate()
+
+    def update(self, post):
+        """Updates a post and returns the version it replaced (None if absent)."""
+        previous = self.storage.update(post)
+        self.invalidate()
+        return previous
+
+    def delete(self, post_id):
+        """Deletes a post and returns it (None if it was already gone)."""
+        removed = self.storage.delete(post_id)
+        self.invalidate()
+        return removed
+
+    def save(self, posts):
+        self.storage.save(posts)
+        self.invalidate()
+
+
+class IdSequence:
+    """Hands out post IDs that are never reused, across threads and processes.
+
+    The high-water mark lives in a small file. A process takes the file lock
+    only to lease a block of ``block_size`` IDs and then serves them from
+    memory, so most inserts cost no I/O at all. IDs leased by a process that
+    exits are skipped, which leaves gaps but never repeats an ID. ``seed`` is
+    called once, when the sequence file does not exist yet, and should return
+    the largest ID already in use.
+    """
+
+    def __init__(self, path, seed=lambda: 0, block_size=ID_BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self._seed = seed
+        self._file_lock = FileLock(f"{path}.lock")
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0  # Exclusive end of the block leased by this process
+
+    def _lease(self, count):
+        """Reserves ``count`` IDs in the shared file and returns the first one."""
+        with self._file_lock:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    high_water = int(f.read().strip() or 0)
+            else:
+                high_water = self._seed()
+            f, tmp_path = _open_temp(self.path)
+            with f:
+                f.write(str(high_water + count))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        return high_water + 1
+
+    def next_id(self):
+        """Returns a fresh ID."""
+        with self._lock:
+            if self._next >= self._end:
+                self._next = self._lease(self.block_size)
+                self._end = self._next + self.block_size
+            post_id = self._next
+            self._next += 1
+            return post_id
+
+    def allocate(self, count):
+        """Reserves ``count`` consecutive IDs for a bulk import and returns them as a range."""
+        first = self._lease(count)
+        return range(first, first + count)
+
+
+def make_storage(backend, path):
+    """Returns the storage backend registered under ``backend``."""
+    backends = {
+        'json': JsonPostStorage,
+        'wal': WalPostStorage,
+    }
+    if backend == 'sqlite':
+        # posts.json -> posts.db, importing the JSON board the first time.
+        return SqlitePostStorage(os.path.splitext(path)[0] + '.db', import_from=path)
+    if backend not in backends:
+        raise ValueError(f"Unknown post storage backend: {backend}")
+    return backends[backend](path)
@@ -0,0 +1,117 @@
+"""
+세션 간 공유 검색 결과 캐시 - TTL + 크기 제한 LRU, 선택적으로 디스크(Parquet) 보관
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import pandas as pd
+
+SEARCH_CACHE_TTL = 30 * 60  # 초
+SEARCH_CACHE_SIZE = 64  # 메모리에 보관할 검색 결과 개수
+
+
+def normalize_search_key(search_mode, search_query, max_results):
+    """캐시 키 정규화 - 유니코드(NFC), 대소문자, 공백 차이는 같은 검색으로 취급"""
+    query = ' '.join(unicodedata.normalize('NFC', search_query).split()).lower()
+    return (search_mode, query, int(max_results))
+
+
+class SearchCache:
+    """검색 결과 테이블을 프로세스 전체에서 공유하는 캐시
+
+    세션은 캐시된 테이블을 참조로 받아 가므로 절대 수정하면 안 된다 (새 테이블을 만들어 쓸 것).
+    같은 키를 여러 세션이 동시에 요청하면 한 번만 수집하고 나머지는 그 결과를 기다린다.
+    ``disk_dir``을 주면 결과를 Parquet으로 저장해 재시작 후에도 TTL 동안 재사용한다.
+    """
+
+    def __init__(self, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_SIZE, disk_dir=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # key -> (만료 시각, 테이블)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> 수집 중임을 알리는 Event
+
+    def _disk_path(self, key):
+        digest = hashlib.sha256(json.dumps(key, ensure_ascii=False).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.parquet")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            return pd.read_parquet(path)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, table):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            table.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            pass  # 디스크 캐시는 선택 사항
+
+    def _remember(self, key, table):
+        """메모리 캐시에 넣고 크기 제한을 넘는 오래된 항목 제거 (lock 보유 상태에서 호출)"""
+        self._entries[key] = (time.monotonic() + self.ttl, table)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """캐시된 테이블 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+        table = self._read_disk(key)
+        if table is not None:
+            with self._lock:
+                self._remember(key, table)
+        return table
+
+    def put(self, key, table):
+        with self._lock:
+            self._remember(key, table)
+        self._write_disk(key, table)
+
+    def get_or_fetch(self, key, fetch):
+        """캐시에 있으면 바로 반환, 없으면 fetch()로 한 번만 수집해 저장 후 반환"""
+        while True:
+            table = self.get(key)
+            if table is not None:
+                return table
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # 다른 세션이 같은 검색을 수집 중 - 끝나면 캐시를 다시 확인
+            event.wait()
+
+        try:
+            table = fetch()
+            self.put(key, table)
+            return table
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
@@ -0,0 +1,53 @@
+"""
+SQLite LRU 캐시 - 문자열 키 → 텍스트 값, 프로세스/재시작 간 공유, 오래 안 쓴 항목부터 삭제
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class SqliteLruCache:
+    """테이블 하나를 LRU 캐시로 사용 (``key``, 값 컬럼, ``used_at``)
+
+    읽을 때마다 ``used_at``을 갱신하고, 저장할 때 ``max_entries``를 넘는 오래된
+    항목을 지운다. 연결은 스레드별로 따로 연다.
+    """
+
+    def __init__(self, path, table, value_column, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        # 테이블/컬럼 이름은 호출하는 모듈의 상수 - 사용자 입력이 아님
+        self._select = f"SELECT {value_column} FROM {table} WHERE key = ?"
+        self._touch = f"UPDATE {table} SET used_at = ? WHERE key = ?"
+        self._insert = f"INSERT OR REPLACE INTO {table} (key, {value_column}, used_at) VALUES (?, ?, ?)"
+        self._trim = (f"DELETE FROM {table} WHERE key IN ("
+                      f"SELECT key FROM {table} ORDER BY used_at DESC LIMIT -1 OFFSET ?)")
+        with self._connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                         f"(key TEXT PRIMARY KEY, {value_column} TEXT NOT NULL, used_at REAL NOT NULL)")
+
+    def _connection(self):
+        """스레드별 연결 - sqlite3 연결은 스레드 간 공유 불가"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """캐시된 값 (없으면 None)"""
+        with self._connection() as conn:
+            row = conn.execute(self._select, (key,)).fetchone()
+            if row is not None:
+                conn.execute(self._touch, (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key, value):
+        with self._connection() as conn:
+            conn.execute(self._insert, (key, value, time.time()))
+            conn.execute(self._trim, (self.max_entries,))
@@ -7,32 +7,72 @@ import os
 # from dotenv import load_dotenv
 import time
 import json
+import uuid
 from datetime import datetime
 import matplotlib.pyplot as plt
 # 폰트 적용
 import os
-import matplotlib.font_manager as fm  # 폰트 관련 용도 as fm
+from font_setup import register_custom_fonts
+from chart_cache import year_chart_png
+from patent_export import EXPORT_DIR, EXPORT_FORMATS, write_export
+from patent_index import extend_index, highlight, index_for
+from patent_stats import PatentStats
+from patent_table import merge_patent_tables, normalize_app_num, patent_records, to_patent_table
+from summary_cache import SummaryCache
+from analysis_jobs import AnalysisJobs, is_analysis_job_id
+from chunked_analysis import ChunkedAnalysis
+from applicant_index import ApplicantIndex
+from pdf_reports import PdfReports
 # import pandas as pd
 # ↓ koreanize_matplotlib 제거 - distutils 문제 해결!
 
 # 향상된 모듈 임포트
-# from src.kipris_handler import search_all_patents, get_patent_details
+# from src.kipris_handler import get_patent_details
 # from src.llm_handler import AdvancedPatentAnalyzer
+# from kipris_fetcher import KiprisFetcher
+# from search_cache import SearchCache, normalize_search_key
 
 # 환경 설정
 # load_dotenv()
 # KIPRIS_API_KEY = os.getenv("KIPRIS_API_KEY")
 # GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-@st.cache_data
+# @st.cache_resource
+# def get_kipris_fetcher():
+#     # 프로세스 전체가 keep-alive 커넥션 풀과 호출 제한을 공유
+#     return KiprisFetcher(KIPRIS_API_KEY)
+
+# @st.cache_resource
+# def get_search_cache():
+#     # 세션 간 공유 검색 결과 캐시 (TTL/LRU, 재시작 대비 디스크 보관)
+#     return SearchCache(disk_dir=os.path.join('.cache', 'searches'))
+
+@st.cache_resource
+def get_summary_cache():
+    # 초록 해시 기반 AI 요약 캐시 - 모든 세션이 공유하고 재시작 후에도 유지
+    return SummaryCache()
+
+@st.cache_resource
+def get_analysis_jobs():
+    # AI 분석 작업 풀 - 같은 요청은 세션이 달라도 한 번만 분석하고 결과는 디스크에 보관
+    # 대량 특허는 청크별 맵리듀스로 분석 (청크 결과 캐시 → 바뀐 청크와 최종 합산만 재계산)
+    return AnalysisJobs(analyze=ChunkedAnalysis().analyze)
+
+@st.cache_resource
+def get_pdf_reports():
+    # PDF 보고서 파일 캐시 - 분석이 끝나면 미리 생성, 같은 내용이면 다시 만들지 않음
+    return PdfReports()
+
+@st.cache_resource
+def get_applicant_directory():
+    # 지금까지 수집한 출원인 사전 (표기 정규화 + 접두어 색인) - 출원인 검색 자동완성용, 재시작 후에도 유지
+    return ApplicantIndex.load()
+
+@st.cache_resource
 def fontRegistered():
-    font_dirs = [os.getcwd() + '/customFonts']
-    font_files = fm.findSystemFonts(fontpaths=font_dirs)
+    # 디스크 캐시된 폰트 목록으로 필요한 한글 폰트만 등록 (폰트가 바뀔 때만 재스캔)
+    register_custom_fonts(os.getcwd() + '/customFonts', families=['Noto Sans KR'])
 
-    for font_file in font_files:
-        fm.fontManager.addfont(font_file)
-    fm._load_fontmanager(try_read_cache=False)
-   
 
 def setup_korean_font():
     """Windows/Mac/Linux 환경에서 한글 폰트 자동 설정 - distutils 의존성 없음"""
@@ -45,7 +85,78 @@ def setup_korean_font():
         plt.rcParams['font.family'] = 'Noto Sans KR'
         plt.rcParams['axes.unicode_minus'] = False
         return True
-            
+
+
+def merge_search_results(table, source_query):
+    """검색 결과를 작업 집합에 누적 - 처음 보는 출원번호만 추가하고 통계/색인도 추가분만 갱신"""
+    base_table = st.session_state.patents
+    merged, new_rows = merge_patent_tables(base_table, table, st.session_state.patent_keys, source_query)
+    st.session_state.patents = merged
+    st.session_state.patent_stats.add(new_rows)
+    if merged is not table:  # 캐시 테이블을 그대로 쓰면 색인도 index_for가 공유
+        extend_index(merged, base_table, new_rows)
+    if not new_rows.empty:
+        # 이전 분석은 작업 집합이 바뀌기 전 특허 기준이므로 버림
+        for key in ('analysis_result', 'analysis_report_data', 'analysis_job'):
+            st.session_state.pop(key, None)
+        st.query_params.pop('analysis_job', None)
+    return new_rows
+
+
+def clear_patents():
+    """작업 집합 초기화"""
+    st.session_state.patents = to_patent_table([])
+    st.session_state.patent_stats = PatentStats.from_table(st.session_state.patents)
+    st.session_state.patent_keys = set()
+
+
+def pdf_report_data():
+    """PDF 생성용 데이터 - 검색 정보 + 미리 계산된 통계 요약"""
+    stats = st.session_state.patent_stats.summary()
+    return {
+        "search_query": st.session_state.get('search_query', ''),
+        "total_count": len(st.session_state.patents),
+        "top_applicants": stats["top_applicants"],
+        "yearly_trends": stats["yearly_trends"],
+        "status_distribution": stats["status_distribution"]
+    }
+
+
+@st.fragment(run_every=2)
+def show_analysis_job():
+    """백그라운드 분석 작업을 2초마다 확인해 지금까지 도착한 출력을 표시 - 끝나면 결과를 세션에 옮기고 전체 화면 갱신
+
+    작업을 기다리지 않고 매번 바로 돌아오므로 분석 중에도 다른 입력이 막히지 않는다.
+    """
+    job_id = st.session_state.analysis_job
+    status = get_analysis_jobs().status(job_id)
+
+    if status['state'] == 'running':
+        st.markdown("### 🎯 AI 분석 결과")
+        st.info(f"🧠 {status['meta'].get('analysis_type', 'AI 분석')} 수행 중... "
+                f"대량 데이터를 분석하고 있습니다. ({status['elapsed']:.0f}초 경과)")
+        if status['partial']:
+            st.markdown(status['partial'])
+        return
+
+    del st.session_state.analysis_job
+    st.query_params.pop('analysis_job', None)
+
+    if status['state'] == 'done':
+        # 결과 저장
+        st.session_state.analysis_result = status['result']
+        st.session_state.analysis_type = status['meta'].get('analysis_type', '')
+        st.session_state.analysis_time = status['elapsed']
+        st.session_state.user_question = status['meta'].get('user_question', '')
+        # 분석 시점의 검색 정보/통계 - 새로고침 후 이어받으면 지금 테이블은 비어 있음
+        st.session_state.analysis_report_data = status['meta'].get('report_data') or pdf_report_data()
+        # PDF 보고서는 다운로드 요청 전에 백그라운드에서 미리 생성
+        get_pdf_reports().submit(st.session_state.analyzer, st.session_state.analysis_report_data, status['result'])
+        st.toast(f"✅ 분석 완료! (소요시간: {status['elapsed']:.1f}초)")
+        st.rerun()
+    elif status['state'] == 'failed':
+        st.error(f"AI 분석 중 오류가 발생했습니다: {status['error']}")
+
 
 # if not KIPRIS_API_KEY or not GEMINI_API_KEY:
 #     st.error("API 키가 설정되지 않았습니다.")
@@ -118,9 +229,17 @@ st.markdown("""
 st.markdown('<div class="main-title">🤖 AI 특허 분석 챗봇 Pro v4.0</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-title">distutils 완전 해결 + 직접 한글 폰트 설정 + PDF 보고서 생성</div>', unsafe_allow_html=True)
 
-# 세션 상태 초기화
+# 세션 상태 초기화 - 검색 결과는 여러 검색을 누적한 컬럼형 테이블로 보관
 if 'patents' not in st.session_state:
-    st.session_state.patents = [True]
+    clear_patents()
+# 통계는 특허가 바뀔 때 증분 갱신 - 화면에서는 미리 계산된 요약만 읽음
+if 'patent_stats' not in st.session_state:
+    st.session_state.patent_stats = PatentStats.from_table(st.session_state.patents)
+# 작업 집합에 있는 정규화 출원번호 (중복 확인 O(1))
+if 'patent_keys' not in st.session_state:
+    st.session_state.patent_keys = {
+        key for key in st.session_state.patents['app_num'].map(normalize_app_num) if key
+    }
 # if 'analyzer' not in st.session_state:
 #     st.session_state.analyzer = AdvancedPatentAnalyzer(GEMINI_API_KEY)
 
@@ -148,6 +267,11 @@ if 'patents' not in st.session_state:
 #             placeholder="예: 삼성, LG, 현대 (부분입력 가능)",
 #             help="부분일치로 검색됩니다. '삼성' 입력시 '삼성전자', '삼성SDI' 등 모두 검색"
 #         )
+#         # 출원인 사전 자동완성 - (주)/주식회사, 공백 차이는 하나로 묶어서 표시
+#         if search_query.strip():
+#             suggestions = get_applicant_directory().complete(search_query, limit=8)
+#             if suggestions:
+#                 st.caption("추천 출원인: " + ", ".join(f"{name} ({count}건)" for name, count in suggestions))
 #     else:
 #         search_query = st.text_input(
 #             "특허/출원번호:",
@@ -172,24 +296,18 @@ if 'patents' not in st.session_state:
 #     )
     
 #     # 실시간 통계 (사이드바)
-#     if st.session_state.patents:
+#     if not st.session_state.patents.empty:
 #         st.markdown("---")
 #         st.subheader("📊 실시간 통계")
+#         stats = st.session_state.patent_stats.summary()
         
-#         total = len(st.session_state.patents)
-#         st.metric("수집된 특허", f"{total:,}건")
+#         st.metric("수집된 특허", f"{stats['total']:,}건")
         
 #         # 최신 특허 비율
-#         recent_patents = sum(1 for p in st.session_state.patents 
-#                            if p.get('app_date', '')[:4] >= '2020')
-#         recent_ratio = (recent_patents / total * 100) if total > 0 else 0
-#         st.metric("최신 특허(2020년 이후)", f"{recent_ratio:.1f}%")
+#         st.metric("최신 특허(2020년 이후)", f"{stats['recent_ratio']:.1f}%")
         
 #         # 등록 특허 비율
-#         registered = sum(1 for p in st.session_state.patents 
-#                         if '등록' in p.get('reg_status', ''))
-#         reg_ratio = (registered / total * 100) if total > 0 else 0
-#         st.metric("등록 특허", f"{reg_ratio:.1f}%")
+#         st.metric("등록 특허", f"{stats['registered_ratio']:.1f}%")
 
 # # =============================================================================
 # # 메인 콘텐츠 - 위아래 레이아웃
@@ -213,44 +331,57 @@ if 'patents' not in st.session_state:
 #                 status_text = st.empty()
                 
 #                 try:
-#                     status_text.text("🔍 최적 검색 전략 분석 중...")
-#                     progress_bar.progress(10)
+#                     status_text.text("📡 KIPRIS API 페이지 병렬 호출 중...")
                     
-#                     status_text.text("📡 KIPRIS API 대량 호출 중...")
-#                     progress_bar.progress(30)
+#                     # 실제 수집된 페이지 수로 진행률 표시 (콜백은 이 스레드에서 호출됨)
+#                     def show_progress(done_pages, total_pages):
+#                         progress_bar.progress(int(done_pages / total_pages * 80))
+#                         status_text.text(f"📡 KIPRIS API 호출 중... ({done_pages}/{total_pages} 페이지)")
                     
-#                     # 검색 실행
-#                     if search_mode == "🔍 키워드 검색":
-#                         patents = search_all_patents(
-#                             KIPRIS_API_KEY, 
-#                             search_query, 
-#                             [],  # 내부에서 스마트 선택
-#                             max_results
-#                         )
-#                     elif search_mode == "🏢 출원인 검색":
-#                         patents = search_all_patents(
-#                             KIPRIS_API_KEY, 
-#                             search_query, 
-#                             ['applicantName'],
-#                             max_results
-#                         )
-#                     else:
-#                         patent_detail = get_patent_details(KIPRIS_API_KEY, search_query)
-#                         patents = [patent_detail] if patent_detail else []
+#                     # 검색 실행 - 캐시에 없을 때만 호출됨
+#                     def fetch_patents():
+#                         if search_mode == "🔍 키워드 검색":
+#                             patents = get_kipris_fetcher().search(
+#                                 search_query, 
+#                                 [],  # 전체 검색
+#                                 max_results,
+#                                 progress=show_progress
+#                             )
+#                         elif search_mode == "🏢 출원인 검색":
+#                             patents = get_kipris_fetcher().search(
+#                                 search_query, 
+#                                 ['applicantName'],
+#                                 max_results,
+#                                 progress=show_progress
+#                             )
+#                         else:
+#                             patent_detail = get_patent_details(KIPRIS_API_KEY, search_query)
+#                             patents = [patent_detail] if patent_detail else []
+#                         # 검색어를 미리 기록해 두면 첫 누적 때 캐시 테이블을 복사 없이 그대로 사용
+#                         table = to_patent_table([dict(patent, source_query=search_query) for patent in patents])
+#                         # 새로 수집한 결과만 출원인 사전에 반영 (캐시된 검색을 다시 세지 않도록)
+#                         directory = get_applicant_directory()
+#                         directory.add(table['applicant'].value_counts().to_dict())
+#                         directory.save()
+#                         return table
                     
-#                     progress_bar.progress(80)
-#                     status_text.text("🤖 AI가 관련성을 분석하여 필터링 중...")
+#                     # 같은 검색(모드/검색어/건수)은 모든 세션이 공유 캐시의 테이블을 참조로 사용
+#                     search_key = normalize_search_key(search_mode, search_query, max_results)
+#                     patents = get_search_cache().get_or_fetch(search_key, fetch_patents)
                     
-#                     # 결과 저장
-#                     st.session_state.patents = patents
+#                     # 결과 누적 - 이전 검색에 없던 특허만 추가 (통계/색인/분석 캐시는 추가분만 갱신)
+#                     new_patents = merge_search_results(patents, search_query)
 #                     st.session_state.search_query = search_query
 #                     st.session_state.search_time = time.time() - search_start_time
 #                     st.session_state.search_mode = search_mode
                     
 #                     progress_bar.progress(100)
                     
-#                     if patents:
-#                         status_text.success(f"✅ {len(patents)}건 발견! (소요시간: {st.session_state.search_time:.1f}초)")
+#                     if not patents.empty:
+#                         status_text.success(
+#                             f"✅ {len(patents)}건 발견, 새 특허 {len(new_patents)}건 추가! "
+#                             f"(소요시간: {st.session_state.search_time:.1f}초)"
+#                         )
 #                     else:
 #                         status_text.error("❌ 검색 결과가 없습니다.")
                     
@@ -263,12 +394,16 @@ if 'patents' not in st.session_state:
 #                     st.error(f"검색 중 오류: {e}")
 
 # with search_col2:
-#     if st.session_state.patents:
+#     if not st.session_state.patents.empty:
 #         st.info(f"**현재 수집된 특허**\n{len(st.session_state.patents):,}건")
+#         if st.button("🗑️ 수집 결과 초기화", use_container_width=True):
+#             clear_patents()
+#             st.rerun()
 
 # 검색 결과가 있을 때만 표시
-if st.session_state.patents:
+if not st.session_state.patents.empty:
     patents = st.session_state.patents
+    stats = st.session_state.patent_stats.summary()
     
     # 성공 배너
     st.markdown(f"""
@@ -290,15 +425,13 @@ if st.session_state.patents:
     #     st.markdown('</div>', unsafe_allow_html=True)
     
     # with col_m2:
-    #     unique_applicants = len(set(p.get('applicant', '') for p in patents))
     #     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    #     st.metric("참여 기업", f"{unique_applicants}개")
+    #     st.metric("참여 기업", f"{stats['unique_applicants']}개")
     #     st.markdown('</div>', unsafe_allow_html=True)
     
     # with col_m3:
-    #     registered = len([p for p in patents if '등록' in p.get('reg_status', '')])
     #     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-    #     st.metric("등록 특허", f"{registered}건")
+    #     st.metric("등록 특허", f"{stats['registered']}건")
     #     st.markdown('</div>', unsafe_allow_html=True)
     
     # with col_m4:
@@ -310,39 +443,15 @@ if st.session_state.patents:
     # 연도별 출원 현황 차트 (직접 한글 폰트 설정 - distutils 없이!)
     st.markdown("### 📈 연도별 특허 출원 현황")
     
-    years = [2024, 2023, 2022, 2021, 2020, 2019]
-    counts = [0] * len(years)
-    years_data = True
-    
-    # for patent in patents:
-    #     app_date = patent.get('app_date', '')
-    #     if app_date and len(app_date) >= 4:
-    #         year = app_date[:4]
-    #         years_data[year] = years_data.get(year, 0) + 1
+    years_data = stats['yearly_trends']  # 출원연도별 건수 (테이블 그룹바이 결과)
     
     if years_data:
-        # matplotlib 차트 생성 (한글 폰트 자동 적용)
-        fig, ax = plt.subplots(figsize=(12, 6))
-        # years = sorted(years_data.keys())
-        # counts = [years_data[year] for year in years]
-        
-        ax.bar(years, counts, color='#3b82f6', alpha=0.8)
-        
-        # 한글 지원 여부에 따라 제목 설정
-        if st.session_state.get('korean_support', False):
-            ax.set_title('연도별 특허 출원 현황', fontsize=16, fontweight='bold')
-            ax.set_xlabel('연도', fontsize=12)
-            ax.set_ylabel('출원 건수', fontsize=12)
-        else:
-            ax.set_title('Patent Applications by Year', fontsize=16, fontweight='bold')
-            ax.set_xlabel('Year', fontsize=12)
-            ax.set_ylabel('Applications', fontsize=12)
-        
-        ax.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close(fig)  # 메모리 정리
+        years = sorted(years_data.keys())
+        counts = [years_data[year] for year in years]
+
+        # 렌더링 캐시 - 집계/언어/옵션이 같으면 matplotlib 작업 없이 PNG 재사용 (한글 폰트 자동 적용)
+        chart_png = year_chart_png(years, counts, st.session_state.get('korean_support', False))
+        st.image(chart_png, use_container_width=True)
     else:
         st.info("연도별 데이터가 충분하지 않습니다.")
     
@@ -350,31 +459,59 @@ if st.session_state.patents:
     st.markdown("### 📋 특허 목록 미리보기")
     
     page_size = 5
-    total_pages = (len(patents) + page_size - 1) // page_size
     
     display_mode = st.radio("표시 모드:", ["📝 요약형", "📄 상세형"], horizontal=True)
     
+    # 결과 내 검색 - 결과 테이블별 역색인(한 번만 생성)으로 일치 항목을 관련도순 정렬
+    result_query = st.text_input(
+        "🔎 결과 내 검색:",
+        placeholder="예: 배터리 전극, 삼성 (제목/초록/출원인/발명자)"
+    ).strip()
+    if result_query:
+        hits = index_for(patents).search(result_query)
+        view = patents.iloc[[row for row, _ in hits]]
+        st.caption(f"🔎 '{result_query}' 일치 {len(view):,}건 (관련도순)")
+    else:
+        view = patents
+    
+    def mark(text):
+        # 결과 내 검색어와 겹치는 부분 강조
+        return highlight(text, result_query) if isinstance(text, str) else text
+    
+    total_pages = (len(view) + page_size - 1) // page_size
+    
     if total_pages > 1:
         current_page = st.selectbox("페이지 선택:", range(1, total_pages + 1))
         start_idx = (current_page - 1) * page_size
         end_idx = start_idx + page_size
-        display_patents = patents[start_idx:end_idx]
-        st.info(f"📄 페이지 {current_page}/{total_pages} (전체 {len(patents)}건 중 {len(display_patents)}건 표시)")
+        display_patents = patent_records(view.iloc[start_idx:end_idx])  # 현재 페이지만 dict로 변환
+        st.info(f"📄 페이지 {current_page}/{total_pages} (전체 {len(view)}건 중 {len(display_patents)}건 표시)")
     else:
-        display_patents = patents[:page_size]
+        display_patents = patent_records(view.iloc[:page_size])
         start_idx = 0
     
+    # 현재 페이지 전체를 백그라운드에서 일괄 요약 (결과는 요약 캐시에 저장되어 다음 실행부터 표시)
+    if display_mode == "📝 요약형":
+        if st.button("🤖 이 페이지 전체 AI 요약"):
+            get_summary_cache().summarize_batch(
+                st.session_state.analyzer,
+                [patent.get('abstract', '') for patent in display_patents]
+            )
+            st.info("⏳ 백그라운드에서 요약 중입니다. 잠시 후 화면을 새로 고치면 요약이 표시됩니다.")
+    
     # 특허 카드 표시
     for i, patent in enumerate(display_patents):
-        with st.expander(f"**{start_idx + i + 1}. {patent.get('title', 'N/A')}**"):
+        with st.expander(f"**{start_idx + i + 1}. {mark(patent.get('title', 'N/A'))}**"):
             if display_mode == "📝 요약형":
                 col_info, col_action = st.columns([2, 1])
                 
                 with col_info:
-                    st.write(f"**📋 출원인:** {patent.get('applicant', 'N/A')}")
-                    st.write(f"**👨‍🔬 발명자:** {patent.get('inventor', '정보없음')}")  # ← 완전 해결!
+                    st.write(f"**📋 출원인:** {mark(patent.get('applicant', 'N/A'))}")
+                    st.write(f"**👨‍🔬 발명자:** {mark(patent.get('inventor', '정보없음'))}")  # ← 완전 해결!
                     st.write(f"**📅 출원일:** {patent.get('app_date', 'N/A')}")
                     st.write(f"**⚖️ 등록상태:** {patent.get('reg_status', 'N/A')}")
+                    if patent.get('source_query'):
+                        st.write(f"**🔎 검색어:** {patent['source_query']}")
                 
                 with col_action:
                     # 다중 KIPRIS 링크 옵션 (Bad Gateway 문제 해결)
@@ -388,96 +525,140 @@ if st.session_state.patents:
                         st.markdown(f"• [기존 KIPRIS](http://kpat.kipris.or.kr/kpat/biblio.do?method=biblioFrame&applno={clean_num})")
                         st.markdown(f"• [검색으로 찾기](https://plus.kipris.or.kr/kpat/search/totalSearch.do?param1={app_num})")
                     
-                    if st.button("🤖 AI 요약", key=f"summary_{start_idx + i}"):
+                    # 이미 요약된 초록(다른 세션/일괄 요약 포함)은 바로 표시
+                    abstract = patent.get('abstract', '')
+                    summary = get_summary_cache().get(abstract)
+                    if summary is None and get_summary_cache().is_pending(abstract):
+                        st.caption("⏳ AI 요약 중...")
+                    elif summary is None and st.button("🤖 AI 요약", key=f"summary_{start_idx + i}"):
                         with st.spinner("AI 요약 중..."):
-                            abstract = patent.get('abstract', '')
-                            summary = st.session_state.analyzer.quick_summarize(abstract)
-                            st.success("**🎯 AI 요약:**")
-                            st.info(summary)
+                            summary = get_summary_cache().summarize(st.session_state.analyzer, abstract)
+                    if summary is not None:
+                        st.success("**🎯 AI 요약:**")
+                        st.info(summary)
             else:
                 # 상세형 표시
-                st.write(f"**📋 출원인:** {patent.get('applicant', 'N/A')}")
-                st.write(f"**👨‍🔬 발명자:** {patent.get('inventor', '정보없음')}")
+                st.write(f"**📋 출원인:** {mark(patent.get('applicant', 'N/A'))}")
+                st.write(f"**👨‍🔬 발명자:** {mark(patent.get('inventor', '정보없음'))}")
                 st.write(f"**📅 출원일:** {patent.get('app_date', 'N/A')}")
                 st.write(f"**📄 출원번호:** {patent.get('app_num', 'N/A')}")
                 st.write(f"**⚖️ 등록상태:** {patent.get('reg_status', 'N/A')}")
+                if patent.get('source_query'):
+                    st.write(f"**🔎 검색어:** {patent['source_query']}")
                 
                 abstract = patent.get('abstract', 'N/A')
-                st.write(f"**📄 초록:** {abstract}")
+                st.write(f"**📄 초록:** {mark(abstract)}")
                 
                 # KIPRIS 링크
                 kipris_url = patent.get('kipris_url')
                 if kipris_url:
                     st.markdown(f"🔗 **[KIPRIS에서 자세히 보기]({kipris_url})**")
 
+    # 특허 목록 내보내기 - 청크 단위로 파일에 기록해 대량 데이터도 메모리 사용량 일정
+    st.markdown("### 💾 특허 목록 내보내기")
+    
+    export_col1, export_col2 = st.columns([1, 2])
+    
+    with export_col1:
+        export_format = st.selectbox("파일 형식:", list(EXPORT_FORMATS))
+    
+    with export_col2:
+        extension, mime = EXPORT_FORMATS[export_format]
+        export_key = (id(patents), len(patents), export_format)  # 작업 집합이 바뀌면 다시 생성
+        
+        if st.session_state.get('export_key') != export_key:
+            if st.button(f"📦 {export_format} 파일 만들기", use_container_width=True):
+                with st.spinner(f"📦 {len(patents):,}건을 {export_format}로 내보내는 중..."):
+                    if 'export_path' in st.session_state and os.path.exists(st.session_state.export_path):
+                        os.remove(st.session_state.export_path)  # 이전 내보내기 파일 정리
+                    if 'export_id' not in st.session_state:
+                        st.session_state.export_id = uuid.uuid4().hex
+                    st.session_state.export_path = write_export(
+                        patents,
+                        export_format,
+                        os.path.join(EXPORT_DIR, f"patents_{st.session_state.export_id}.{extension}")
+                    )
+                    st.session_state.export_key = export_key
+        
+        if st.session_state.get('export_key') == export_key:
+            with open(st.session_state.export_path, 'rb') as export_file:
+                st.download_button(
+                    f"⬇️ {export_format} 다운로드 ({len(patents):,}건)",
+                    data=export_file,
+                    file_name=f"특허목록_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime,
+                    use_container_width=True
+                )
+
 # =============================================================================
 # 두 번째 섹션: AI 분석 (검색 결과 아래에 배치)
 # =============================================================================
 
-if st.session_state.patents:
+# 새로고침/재접속 직후에는 검색 결과가 비어 있어도 주소의 분석 작업을 이어받아 결과를 표시
+if 'analysis_job' not in st.session_state and 'analysis_job' in st.query_params:
+    if is_analysis_job_id(st.query_params['analysis_job']):
+        st.session_state.analysis_job = st.query_params['analysis_job']
+    else:
+        st.query_params.pop('analysis_job')  # 직접 고친 주소 등 - 작업 ID가 아니면 무시
+
+if not st.session_state.patents.empty or 'analysis_job' in st.session_state or 'analysis_result' in st.session_state:
     st.markdown("---")
     
     st.markdown('<div class="analysis-section">', unsafe_allow_html=True)
     st.markdown("## 🧠 AI 특허 분석")
     st.markdown("대량의 특허 데이터를 AI가 종합 분석하여 전문적인 인사이트를 제공합니다.")
     
-    # 분석 설정
-    analysis_col1, analysis_col2 = st.columns([2, 1])
+    if not st.session_state.patents.empty:
+        # 분석 설정
+        analysis_col1, analysis_col2 = st.columns([2, 1])
     
-    with analysis_col1:
-        user_question = st.text_area(
-            "🔍 추가 분석 질문 (선택사항):",
-            placeholder="""예시 질문:
+        with analysis_col1:
+            user_question = st.text_area(
+                "🔍 추가 분석 질문 (선택사항):",
+                placeholder="""예시 질문:
 • 이 기술 분야의 시장 전망은 어떤가요?
 • 주요 경쟁사들의 기술 전략 차이점은?
 • 향후 투자해야 할 핵심 기술 영역은?
 • 특허 분쟁 위험이 높은 영역은 어디인가요?
 • 신규 진입 시 고려해야 할 사항은?""",
-            height=120
-        )
+                height=120
+            )
     
-    with analysis_col2:
-        st.info(f"""
-        **🔢 분석 대상 데이터**
-        - 총 특허: {len(st.session_state.patents):,}건
-        - 분석 모드: {analysis_type}
-        - 예상 소요시간: 30-60초
-        """)
+        with analysis_col2:
+            st.info(f"""
+            **🔢 분석 대상 데이터**
+            - 총 특허: {len(st.session_state.patents):,}건
+            - 분석 모드: {analysis_type}
+            - 예상 소요시간: 30-60초
+            """)
         
-        if st.button("🚀 AI 분석 시작", type="secondary", use_container_width=True):
-            analysis_start_time = time.time()
+            if st.button("🚀 AI 분석 시작", type="secondary", use_container_width=True):
+                # 분석 타입 매핑
+                analysis_map = {
+                    "🏆 경쟁기관 분석": "competitive_analysis",
+                    "📈 기술 동향 분석": "trend_analysis",
+                    "🔮 향후 방향 예측": "future_direction",
+                    "📊 종합 분석": "comprehensive_analysis"
+                }
             
-            with st.spinner(f"🧠 {analysis_type} 수행 중... 대량 데이터를 분석하고 있습니다."):
-                try:
-                    # 분석 타입 매핑
-                    analysis_map = {
-                        "🏆 경쟁기관 분석": "competitive_analysis",
-                        "📈 기술 동향 분석": "trend_analysis",
-                        "🔮 향후 방향 예측": "future_direction",
-                        "📊 종합 분석": "comprehensive_analysis"
-                    }
-                    
-                    analysis_key = analysis_map.get(analysis_type, "competitive_analysis")
-                    
-                    result = st.session_state.analyzer.comprehensive_analysis(
-                        st.session_state.patents,
-                        analysis_key,
-                        user_question
-                    )
-                    
-                    analysis_time = time.time() - analysis_start_time
-                    
-                    # 결과 저장
-                    st.session_state.analysis_result = result
-                    st.session_state.analysis_type = analysis_type
-                    st.session_state.analysis_time = analysis_time
-                    st.session_state.user_question = user_question
-                    
-                    st.success(f"✅ 분석 완료! (소요시간: {analysis_time:.1f}초)")
-                    st.rerun()
-                    
-                except Exception as e:
-                    st.error(f"AI 분석 중 오류가 발생했습니다: {e}")
+                analysis_key = analysis_map.get(analysis_type, "competitive_analysis")
+            
+                # 백그라운드 작업으로 실행 - 출력은 아래 결과 영역에 도착하는 대로 스트리밍
+                job_id = get_analysis_jobs().submit(
+                    st.session_state.analyzer,
+                    patent_records(st.session_state.patents),
+                    analysis_key,
+                    user_question,
+                    meta={'analysis_type': analysis_type, 'user_question': user_question,
+                          'report_data': pdf_report_data()}
+                )
+                st.session_state.analysis_job = job_id
+                st.session_state.pop('analysis_result', None)
+                st.query_params['analysis_job'] = job_id  # 새로고침/재접속 후에도 이어서 확인
+    
+    # 진행 중인 분석 작업 출력 스트리밍
+    if 'analysis_job' in st.session_state:
+        show_analysis_job()
     
     # AI 분석 결과 표시
     if 'analysis_result' in st.session_state:
@@ -486,7 +667,7 @@ if st.session_state.patents:
         st.info(f"""
         **📊 분석 정보**
         - 분석 유형: {st.session_state.analysis_type}
-        - 분석 특허 수: {len(st.session_state.patents):,}건
+        - 분석 특허 수: {st.session_state.analysis_report_data['total_count']:,}건
         - 소요 시간: {st.session_state.analysis_time:.1f}초
         - 분석 일시: {datetime.now().strftime('%Y-%m-%d %H:%M')}
         """)
@@ -504,9 +685,9 @@ if st.session_state.patents:
         with download_col1:
             # JSON 다운로드
             analysis_data = {
-                "검색어": st.session_state.get('search_query', ''),
+                "검색어": st.session_state.analysis_report_data['search_query'],
                 "검색_모드": st.session_state.get('search_mode', ''),
-                "검색_결과_수": len(st.session_state.patents),
+                "검색_결과_수": st.session_state.analysis_report_data['total_count'],
                 "분석_유형": st.session_state.analysis_type,
                 "사용자_질문": st.session_state.get('user_question', ''),
                 "분석_일시": datetime.now().isoformat(),
@@ -524,59 +705,35 @@ if st.session_state.patents:
             )
         
         with download_col2:
-            # PDF 다운로드
-            if st.button("📑 PDF 보고서 생성", use_container_width=True):
+            # PDF 다운로드 - 생성된 보고서 파일을 그대로 전달
+            pdf_reports = get_pdf_reports()
+            pdf_data = st.session_state.analysis_report_data
+            pdf_path = pdf_reports.path(pdf_data, st.session_state.analysis_result)
+            
+            if pdf_path is None and st.button("📑 PDF 보고서 생성", use_container_width=True):
                 try:
                     with st.spinner("📑 전문 PDF 보고서를 생성 중입니다..."):
-                        # PDF 생성용 데이터 준비
-                        pdf_data = {
-                            "search_query": st.session_state.get('search_query', ''),
-                            "total_count": len(st.session_state.patents),
-                            "top_applicants": {},
-                            "yearly_trends": {},
-                            "status_distribution": {}
-                        }
-                        
-                        # 통계 데이터 생성
-                        applicants = {}
-                        years = {}
-                        statuses = {}
-                        
-                        for patent in st.session_state.patents:
-                            applicant = patent.get('applicant', '정보없음')
-                            applicants[applicant] = applicants.get(applicant, 0) + 1
-                            
-                            app_date = patent.get('app_date', '')
-                            if app_date and len(app_date) >= 4:
-                                year = app_date[:4]
-                                years[year] = years.get(year, 0) + 1
-                            
-                            status = patent.get('reg_status', '출원')
-                            statuses[status] = statuses.get(status, 0) + 1
-                        
-                        pdf_data["top_applicants"] = dict(sorted(applicants.items(), key=lambda x: x[1], reverse=True)[:10])
-                        pdf_data["yearly_trends"] = dict(sorted(years.items()))
-                        pdf_data["status_distribution"] = statuses
-                        
-                        # PDF 생성
-                        pdf_buffer = st.session_state.analyzer.generate_pdf_report(
+                        # 분석 완료 시 시작된 생성 작업이 있으면 그 완료를 기다림
+                        pdf_path = pdf_reports.submit(
+                            st.session_state.analyzer,
                             pdf_data, 
                             st.session_state.analysis_result
-                        )
-                        
-                        st.download_button(
-                            "📑 PDF 보고서 다운로드",
-                            data=pdf_buffer.getvalue(),
-                            file_name=f"특허분석보고서_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                        
-                        st.success("✅ PDF 보고서가 생성되었습니다!")
+                        ).result()
+                    st.success("✅ PDF 보고서가 생성되었습니다!")
                         
                 except Exception as e:
                     st.error(f"PDF 생성 중 오류: {e}")
                     st.info("💡 대안: JSON 파일을 다운로드하신 후 별도 문서로 변환해 주세요.")
+            
+            if pdf_path is not None:
+                with open(pdf_path, 'rb') as pdf_file:
+                    st.download_button(
+                        "📑 PDF 보고서 다운로드",
+                        data=pdf_file,
+                        file_name=f"특허분석보고서_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
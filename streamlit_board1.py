@@ -1,33 +1,82 @@
 
 import streamlit as st
-import json
 import os
 import datetime
-import time
+
+from image_pipeline import all_rendition_paths, display_path, remove_renditions, submit_renditions
+from post_storage import CachedPostStore, IdSequence, make_storage
+from upload_store import UploadRejected, UploadStore
 
 # --- Configuration ---
 POSTS_FILE = 'posts.json'
 UPLOAD_DIR = 'uploads'
+STORAGE_BACKEND = os.environ.get('POST_STORAGE_BACKEND', 'wal')  # 'wal', 'json' or 'sqlite'
+PAGE_SIZE = 20  # Posts rendered per feed page
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
 
 # --- Setup ---
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # --- Data Handling Functions ---
+@st.cache_resource
+def get_storage():
+    """Returns the process-wide post store shared by every session."""
+    return CachedPostStore(make_storage(STORAGE_BACKEND, POSTS_FILE))
+
+@st.cache_resource
+def get_id_sequence():
+    """Returns the post ID allocator shared by every session and worker process."""
+    return IdSequence(f"{POSTS_FILE}.seq", seed=lambda: max((p['id'] for p in load_posts()), default=0))
+
 def load_posts():
-    """Loads posts from the JSON file."""
-    if not os.path.exists(POSTS_FILE):
-        return []
-    with open(POSTS_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def save_posts(posts):
-    """Saves posts to the JSON file."""
-    with open(POSTS_FILE, 'w') as f:
-        json.dump(posts, f, indent=4)
+    """Loads posts from the shared store (read-only; copy a post before editing it)."""
+    return get_storage().load()
+
+def referenced_upload_paths(posts):
+    """Lists every upload file the given posts still use, renditions included."""
+    paths = []
+    for post in posts:
+        if post.get("image_path"):
+            paths.append(post["image_path"])
+            paths.extend(all_rendition_paths(post["image_path"]))
+    return paths
+
+@st.cache_resource
+def get_upload_store():
+    """Returns the content-addressed store that holds uploaded images.
+
+    Its background sweeper reclaims files in uploads/ that no post references.
+    """
+    store = UploadStore(UPLOAD_DIR)
+    post_store = get_storage()
+
+    def keep_paths():
+        posts = post_store.load()
+        # A corrupt or unreadable posts file loads as an empty board; skip the pass
+        # rather than treat every referenced upload as orphaned
+        if not posts and store.has_references():
+            return None
+        return referenced_upload_paths(posts)
+
+    store.start_sweeper(keep_paths)
+    return store
+
+def get_post(post_id):
+    """Looks up a single post by ID (read-only)."""
+    return get_storage().get(post_id)
+
+def create_post(post):
+    """Stores a new post."""
+    get_storage().create(post)
+
+def update_post(post):
+    """Stores the new version of an existing post and returns the version it replaced."""
+    return get_storage().update(post)
+
+def delete_post(post_id):
+    """Removes a post from storage and returns it (None if it was already gone)."""
+    return get_storage().delete(post_id)
 
 # --- UI Components ---
 st.set_page_config(page_title="Image Bulletin Board", layout="centered")
@@ -44,48 +93,57 @@ with st.sidebar.form("new_post_form", clear_on_submit=True):
 
     if submitted:
         if author and title and content:
-            posts = load_posts()
-            image_path = None
-
             # Handle file upload
+            image_path = None
+            upload_error = None
             if uploaded_file is not None:
-                # Create a unique filename and save the file
-                unique_filename = f"{int(time.time())}_{uploaded_file.name}"
-                image_path = os.path.join(UPLOAD_DIR, unique_filename)
-                with open(image_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-            new_post = {
-                "id": len(posts) + 1, # Simple ID generation
-                "author": author,
-                "title": title,
-                "content": content,
-                "timestamp": datetime.datetime.now().isoformat(),
-                "image_path": image_path
-            }
-            posts.append(new_post)
-            save_posts(posts)
-            st.sidebar.success("Post created successfully!")
-            st.rerun()
+                try:
+                    # Streamed in chunks; identical images are stored once with a reference per post
+                    image_path = get_upload_store().put(uploaded_file, max_bytes=MAX_UPLOAD_BYTES)
+                    # Thumbnails are built in the background; the feed shows the original until they exist
+                    submit_renditions(image_path, written=get_upload_store().add)
+                except UploadRejected as e:
+                    upload_error = str(e)
+
+            if upload_error:
+                st.sidebar.error(upload_error)
+            else:
+                new_post = {
+                    "id": get_id_sequence().next_id(),
+                    "author": author,
+                    "title": title,
+                    "content": content,
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "image_path": image_path
+                }
+                create_post(new_post)
+                st.session_state.feed_cursors = [None]  # Jump back to the newest page
+                st.sidebar.success("Post created successfully!")
+                st.rerun()
         else:
             st.sidebar.error("Please fill out all fields.")
 
 # --- Display Posts (Main Area) ---
-posts = load_posts()
+# Only the current page is fetched and rendered. feed_cursors holds the cursor of every
+# page the user has paged through, so "Newer posts" can step back without offsets.
+if 'feed_cursors' not in st.session_state:
+    st.session_state.feed_cursors = [None]
+page_posts, next_cursor = get_storage().page(before=st.session_state.feed_cursors[-1], limit=PAGE_SIZE)
 
-if not posts:
+if not page_posts and len(st.session_state.feed_cursors) == 1:
     st.info("No posts yet. Create one using the form on the left!")
 else:
-    sorted_posts = sorted(posts, key=lambda x: x['timestamp'], reverse=True)
-
-    for post in sorted_posts:
+    for post in page_posts:
         with st.container(border=True):
             st.subheader(post['title'])
             st.caption(f"Posted by {post['author']} on {datetime.datetime.fromisoformat(post['timestamp']).strftime('%Y-%m-%d %H:%M')}")
             
-            # Display image if it exists
-            if post.get("image_path") and os.path.exists(post["image_path"]):
-                st.image(post["image_path"])
+            # Display the feed-sized rendition if the image exists (an index lookup, not a stat);
+            # the full-resolution original is only sent on request
+            if post.get("image_path") and get_upload_store().exists(post["image_path"]):
+                st.image(display_path(post["image_path"], 'feed', exists=get_upload_store().exists))
+                if st.toggle("Show original", key=f"original_{post['id']}"):
+                    st.image(post["image_path"])
             
             st.write(post['content'])
 
@@ -96,11 +154,12 @@ else:
                     st.session_state.edit_post_id = post['id']
             with col2:
                 if st.button("Delete", key=f"delete_{post['id']}"):
-                    # Delete associated image file if it exists
-                    if post.get("image_path") and os.path.exists(post["image_path"]):
-                        os.remove(post["image_path"])
-                    posts_after_deletion = [p for p in posts if p['id'] != post['id']]
-                    save_posts(posts_after_deletion)
+                    removed_post = delete_post(post['id'])
+                    # Only the request that actually removed the post drops its image reference,
+                    # so a double click or a stale page cannot release a shared blob twice
+                    if removed_post and removed_post.get("image_path"):
+                        if get_upload_store().release(removed_post["image_path"]):
+                            remove_renditions(removed_post["image_path"], remove=get_upload_store().remove)
                     st.rerun()
 
             # --- Update Form (appears when 'Edit' is clicked) ---
@@ -114,29 +173,50 @@ else:
                     save_button, cancel_button = st.columns(2)
                     with save_button:
                         if st.form_submit_button("Save Changes"):
-                            updated_post_ref = next((p for p in posts if p['id'] == post['id']), None)
-                            if updated_post_ref:
+                            stored_post = get_post(post['id'])
+                            if stored_post:
+                                updated_post_ref = dict(stored_post)
                                 updated_post_ref['title'] = new_title
                                 updated_post_ref['content'] = new_content
 
                                 # Handle image replacement
+                                upload_error = None
                                 if new_uploaded_file is not None:
-                                    # Delete old image if it exists
-                                    if updated_post_ref.get("image_path") and os.path.exists(updated_post_ref["image_path"]):
-                                        os.remove(updated_post_ref["image_path"])
-                                    
-                                    # Save new image
-                                    unique_filename = f"{int(time.time())}_{new_uploaded_file.name}"
-                                    new_image_path = os.path.join(UPLOAD_DIR, unique_filename)
-                                    with open(new_image_path, "wb") as f:
-                                        f.write(new_uploaded_file.getbuffer())
-                                    updated_post_ref["image_path"] = new_image_path
-
-                                save_posts(posts)
-                                del st.session_state.edit_post_id
-                                st.rerun()
+                                    # Store the new image before releasing the old one, so re-uploading
+                                    # the same picture never drops its last reference
+                                    try:
+                                        updated_post_ref["image_path"] = get_upload_store().put(new_uploaded_file, max_bytes=MAX_UPLOAD_BYTES)
+                                        submit_renditions(updated_post_ref["image_path"], written=get_upload_store().add)
+                                    except UploadRejected as e:
+                                        upload_error = str(e)
+
+                                if upload_error:
+                                    st.error(upload_error)
+                                else:
+                                    previous_post = update_post(updated_post_ref)
+                                    # The new upload took its own reference, even when it is the same blob;
+                                    # release the image the update actually replaced, not the one this page saw.
+                                    # If the post was deleted meanwhile nothing was stored, so drop the new upload.
+                                    unused_image_path = None
+                                    if new_uploaded_file is not None:
+                                        unused_image_path = (previous_post or updated_post_ref).get("image_path")
+                                    if unused_image_path and get_upload_store().release(unused_image_path):
+                                        remove_renditions(unused_image_path, remove=get_upload_store().remove)
+                                    del st.session_state.edit_post_id
+                                    st.rerun()
                     with cancel_button:
                         if st.form_submit_button("Cancel"):
                             del st.session_state.edit_post_id
                             st.rerun()
         st.write("") # Add some space
+
+    # --- Feed Navigation ---
+    newer_col, older_col = st.columns(2)
+    with newer_col:
+        if len(st.session_state.feed_cursors) > 1 and st.button("← Newer posts"):
+            st.session_state.feed_cursors.pop()
+            st.rerun()
+    with older_col:
+        if next_cursor is not None and st.button("Older posts →"):
+            st.session_state.feed_cursors.append(next_cursor)
+            st.rerun()
@@ -1,35 +1,64 @@
 import streamlit as st
-import json
 import os
 import datetime
-import time
 import pandas as pd
 import numpy as np
 
+from image_pipeline import remove_renditions
+from post_storage import CachedPostStore, IdSequence, make_storage
+from upload_store import UploadRejected, UploadStore
+
 
 # --- Configuration ---
 POSTS_FILE = 'posts.json'
 UPLOAD_DIR = 'uploads'
+STORAGE_BACKEND = os.environ.get('POST_STORAGE_BACKEND', 'wal')  # 'wal', 'json' or 'sqlite'
 
 # --- Setup ---
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # --- Data Handling Functions ---
+# Shares posts.json with streamlit_board1.py, so both apps must use the same backend.
+@st.cache_resource
+def get_storage():
+    """Returns the process-wide post store shared by every session."""
+    return CachedPostStore(make_storage(STORAGE_BACKEND, POSTS_FILE))
+
+@st.cache_resource
+def get_id_sequence():
+    """Returns the post ID allocator shared by every session and worker process."""
+    return IdSequence(f"{POSTS_FILE}.seq", seed=lambda: max((p['id'] for p in load_posts()), default=0))
+
 def load_posts():
-    """Loads posts from the JSON file."""
-    if not os.path.exists(POSTS_FILE):
-        return []
-    with open(POSTS_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def save_posts(posts):
-    """Saves posts to the JSON file."""
-    with open(POSTS_FILE, 'w') as f:
-        json.dump(posts, f, indent=4)
+    """Loads posts from the shared store (read-only; copy a post before editing it)."""
+    return get_storage().load()
+
+@st.cache_resource
+def get_upload_store():
+    """Returns the content-addressed store that holds uploaded images (shared with streamlit_board1.py)."""
+    return UploadStore(UPLOAD_DIR)
+
+def release_image(image_path):
+    """Drops one reference to an image, deleting it and its renditions once no post uses it."""
+    if get_upload_store().release(image_path):
+        remove_renditions(image_path, remove=get_upload_store().remove)
+
+def get_post(post_id):
+    """Looks up a single post by ID (read-only)."""
+    return get_storage().get(post_id)
+
+def create_post(post):
+    """Stores a new post."""
+    get_storage().create(post)
+
+def update_post(post):
+    """Stores the new version of an existing post and returns the version it replaced."""
+    return get_storage().update(post)
+
+def delete_post(post_id):
+    """Removes a post from storage and returns it (None if it was already gone)."""
+    return get_storage().delete(post_id)
 
 # --- UI Components ---
 st.set_page_config(page_title="Image Bulletin Board", layout="centered")
@@ -50,40 +79,39 @@ with st.sidebar.form("new_post_form", clear_on_submit=True):
 
     if submitted:
         if author and title and content:
-            posts = load_posts()
-            image_path = None
-
             # Handle file upload
+            image_path = None
+            upload_error = None
             if uploaded_file is not None:
-                # Create a unique filename and save the file
-                unique_filename = f"{int(time.time())}_{uploaded_file.name}"
-                image_path = os.path.join(UPLOAD_DIR, unique_filename)
-                with open(image_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-            new_post = {
-                "id": len(posts) + 1, # Simple ID generation
-                "author": author,
-                "title": title,
-                "content": content,
-                "timestamp": datetime.datetime.now().isoformat(),
-                "image_path": image_path
-            }
-            posts.append(new_post)
-            save_posts(posts)
-            st.sidebar.success("Post created successfully!")
-            st.rerun()
+                try:
+                    # Identical images are stored once with a reference per post
+                    image_path = get_upload_store().put(uploaded_file)
+                except UploadRejected as e:
+                    upload_error = str(e)
+
+            if upload_error:
+                st.sidebar.error(upload_error)
+            else:
+                new_post = {
+                    "id": get_id_sequence().next_id(),
+                    "author": author,
+                    "title": title,
+                    "content": content,
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "image_path": image_path
+                }
+                create_post(new_post)
+                st.sidebar.success("Post created successfully!")
+                st.rerun()
         else:
             st.sidebar.error("Please fill out all fields.")
 
 # --- Display Posts (Main Area) ---
-posts = load_posts()
+sorted_posts = get_storage().newest_first()
 
-if not posts:
+if not sorted_posts:
     st.info("No posts yet. Create one using the form on the left!")
 else:
-    sorted_posts = sorted(posts, key=lambda x: x['timestamp'], reverse=True)
-
     for post in sorted_posts:
         with st.container(border=True):
             st.subheader(post['title'])
@@ -102,11 +130,10 @@ else:
                     st.session_state.edit_post_id = post['id']
             with col2:
                 if st.button("Delete", key=f"delete_{post['id']}"):
-                    # Delete associated image file if it exists
-                    if post.get("image_path") and os.path.exists(post["image_path"]):
-                        os.remove(post["image_path"])
-                    posts_after_deletion = [p for p in posts if p['id'] != post['id']]
-                    save_posts(posts_after_deletion)
+                    removed_post = delete_post(post['id'])
+                    # Only the request that actually removed the post drops its image reference
+                    if removed_post and removed_post.get("image_path"):
+                        release_image(removed_post["image_path"])
                     st.rerun()
 
             # --- Update Form (appears when 'Edit' is clicked) ---
@@ -120,27 +147,33 @@ else:
                     save_button, cancel_button = st.columns(2)
                     with save_button:
                         if st.form_submit_button("Save Changes"):
-                            updated_post_ref = next((p for p in posts if p['id'] == post['id']), None)
-                            if updated_post_ref:
+                            stored_post = get_post(post['id'])
+                            if stored_post:
+                                updated_post_ref = dict(stored_post)
                                 updated_post_ref['title'] = new_title
                                 updated_post_ref['content'] = new_content
 
                                 # Handle image replacement
+                                upload_error = None
                                 if new_uploaded_file is not None:
-                                    # Delete old image if it exists
-                                    if updated_post_ref.get("image_path") and os.path.exists(updated_post_ref["image_path"]):
-                                        os.remove(updated_post_ref["image_path"])
-                                    
-                                    # Save new image
-                                    unique_filename = f"{int(time.time())}_{new_uploaded_file.name}"
-                                    new_image_path = os.path.join(UPLOAD_DIR, unique_filename)
-                                    with open(new_image_path, "wb") as f:
-                                        f.write(new_uploaded_file.getbuffer())
-                                    updated_post_ref["image_path"] = new_image_path
-
-                                save_posts(posts)
-                                del st.session_state.edit_post_id
-                                st.rerun()
+                                    # Store the new image before releasing the old one, so re-uploading
+                                    # the same picture never drops its last reference
+                                    try:
+                                        updated_post_ref["image_path"] = get_upload_store().put(new_uploaded_file)
+                                    except UploadRejected as e:
+                                        upload_error = str(e)
+
+                                if upload_error:
+                                    st.error(upload_error)
+                                else:
+                                    previous_post = update_post(updated_post_ref)
+                                    # Release the image the update actually replaced, not the one this page saw;
+                                    # if the post was deleted meanwhile nothing was stored, so drop the new upload
+                                    unused_image_path = (previous_post or updated_post_ref).get("image_path")
+                                    if new_uploaded_file is not None and unused_image_path:
+                                        release_image(unused_image_path)
+                                    del st.session_state.edit_post_id
+                                    st.rerun()
                     with cancel_button:
                         if st.form_submit_button("Cancel"):
                             del st.session_state.edit_post_id
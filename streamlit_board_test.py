@@ -7,20 +7,16 @@ import numpy as np
 # 한글폰트 적용
 # 폰트 적용
 import os
-import matplotlib.font_manager as fm  # 폰트 관련 용도 as fm
+from font_setup import register_custom_fonts
 
 def unique(list):
     x = np.array(list)
     return np.unique(x)
 
-@st.cache_data
+@st.cache_resource
 def fontRegistered():
-    font_dirs = [os.getcwd() + '/customFonts']
-    font_files = fm.findSystemFonts(fontpaths=font_dirs)
-
-    for font_file in font_files:
-        fm.fontManager.addfont(font_file)
-    fm._load_fontmanager(try_read_cache=False)
+    # 디스크 캐시된 폰트 목록으로 필요한 한글 폰트만 등록 (폰트가 바뀔 때만 재스캔)
+    register_custom_fonts(os.getcwd() + '/customFonts', families=['NanumGothic'])
     
 
 def main():
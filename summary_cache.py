@@ -0,0 +1,78 @@
+"""
+AI 요약 캐시 - 초록 내용 해시를 키로 SQLite에 저장해 세션/재시작 간 재사용, 페이지 단위 일괄 요약
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlite_cache import SqliteLruCache
+
+SUMMARY_CACHE_PATH = os.path.join('.cache', 'summaries.db')
+SUMMARY_CACHE_SIZE = 5000  # 보관할 요약 개수 (오래 안 쓴 것부터 삭제)
+SUMMARY_VERSION = 1  # 요약 프롬프트/모델을 바꾸면 올려서 기존 요약 무효화
+BATCH_WORKERS = 4
+
+
+def summary_key(abstract):
+    """초록 내용 해시 - 같은 초록이면 어느 세션/특허에서 요청해도 같은 키"""
+    return hashlib.sha256(f"{SUMMARY_VERSION}\n{abstract.strip()}".encode()).hexdigest()
+
+
+class SummaryCache:
+    """초록 해시 → 요약 텍스트 영구 캐시
+
+    ``summarize``는 캐시에 없을 때만 ``analyzer.quick_summarize``를 호출한다.
+    ``summarize_batch``는 여러 초록을 백그라운드 스레드 풀에서 동시에 요약해
+    캐시를 채우며, 이미 요약 중인 초록은 다시 요청하지 않는다.
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, max_entries=SUMMARY_CACHE_SIZE, workers=BATCH_WORKERS):
+        self._cache = SqliteLruCache(path, 'summaries', 'summary', max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='summary')
+        self._pending = {}  # key -> Future (요약 중)
+        self._lock = threading.Lock()
+
+    def get(self, abstract):
+        """캐시된 요약 (없으면 None)"""
+        if not abstract or not abstract.strip():
+            return None
+        return self._cache.get(summary_key(abstract))
+
+    def put(self, abstract, summary):
+        self._cache.put(summary_key(abstract), summary)
+
+    def summarize(self, analyzer, abstract):
+        """캐시된 요약을 반환하고, 없으면 요약해서 저장"""
+        summary = self.get(abstract)
+        if summary is None:
+            summary = analyzer.quick_summarize(abstract)
+            if abstract and abstract.strip():
+                self.put(abstract, summary)
+        return summary
+
+    def is_pending(self, abstract):
+        """백그라운드에서 요약 중인지"""
+        with self._lock:
+            return bool(abstract) and summary_key(abstract) in self._pending
+
+    def summarize_batch(self, analyzer, abstracts):
+        """캐시에 없는 초록들을 백그라운드에서 동시에 요약 - 바로 반환, 결과는 캐시에 쌓임"""
+        futures = []
+        for abstract in abstracts:
+            if not abstract or not abstract.strip() or self.get(abstract) is not None:
+                continue
+            key = summary_key(abstract)
+            with self._lock:
+                if key in self._pending:
+                    continue
+                future = self._executor.submit(self.summarize, analyzer, abstract)
+                self._pending[key] = future
+            future.add_done_callback(lambda _, key=key: self._finish(key))
+            futures.append(future)
+        return futures
+
+    def _finish(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
@@ -0,0 +1,252 @@
+"""Content-addressed, reference-counted storage for uploaded images."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# --- Configuration ---
+CHUNK_SIZE = 1024 * 1024  # Bytes copied per read while streaming an upload
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+SWEEP_INTERVAL = 600  # Seconds between orphan sweeps
+SWEEP_BATCH = 100  # Most files one sweep deletes
+ORPHAN_GRACE = 3600  # Seconds an unreferenced file is kept, so in-flight uploads are never swept
+
+# Leading bytes of the accepted image formats and the extension their blobs get.
+IMAGE_SIGNATURES = {
+    b'\x89PNG\r\n\x1a\n': '.png',
+    b'\xff\xd8\xff': '.jpg',
+    b'GIF87a': '.gif',
+    b'GIF89a': '.gif',
+}
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload is too large or not one of the accepted image formats."""
+
+
+def _detect_image_suffix(head):
+    for signature, suffix in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return suffix
+    raise UploadRejected("Only PNG, JPEG and GIF images can be uploaded.")
+
+
+class UploadStore:
+    """Stores each distinct upload once, under the SHA-256 of its bytes.
+
+    Blobs live in a sharded layout (``<root>/ab/cd/abcd....png``) so no
+    directory grows unbounded. ``refs.db`` counts how many posts point at each
+    blob; ``release`` only deletes the file when the last reference is gone.
+    Reference changes run inside an immediate SQLite transaction, which
+    serializes them across threads and processes.
+
+    The store also keeps an in-memory index of the files under ``root`` so
+    the feed can check for images without a stat per post. The index is
+    built once, updated by this process's writes and rebuilt by every sweep,
+    which also picks up files written by other processes. Paths found missing
+    are remembered too (images without a rendition, deleted files), so a miss
+    costs one stat per sweep interval rather than one per render.
+    """
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS refs (path TEXT PRIMARY KEY, count INTEGER NOT NULL)"
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(self.SCHEMA)
+        self._index = self._scan()
+        self._missing = set()  # Paths checked on disk and not found since the last sweep
+        self._sweeper = None
+
+    def _connection(self):
+        """Returns this thread's connection; sqlite3 connections are not shared across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, 'refs.db'), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _scan(self):
+        """Lists every file under ``root`` except the reference database."""
+        files = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if dirpath == self.root and name.startswith('refs.db'):
+                    continue
+                files.add(os.path.normpath(os.path.join(dirpath, name)))
+        return files
+
+    def exists(self, path):
+        """Checks for a file under ``root`` in the index, falling back to the disk once per unknown path."""
+        path = os.path.normpath(path)
+        if path in self._index:
+            return True
+        if path in self._missing:
+            return False
+        if os.path.exists(path):
+            self._index.add(path)  # Written by another process
+            return True
+        self._missing.add(path)
+        return False
+
+    def add(self, path):
+        """Records a file this process wrote under ``root`` (e.g. a rendition) in the index."""
+        path = os.path.normpath(path)
+        self._index.add(path)
+        self._missing.discard(path)
+
+    def remove(self, path):
+        """Deletes a file under ``root`` (if present) and drops it from the index."""
+        self._index.discard(os.path.normpath(path))
+        self._missing.add(os.path.normpath(path))
+        if os.path.exists(path):
+            os.remove(path)
+
+    def blob_path(self, digest, suffix):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + suffix)
+
+    def put(self, fileobj, max_bytes=MAX_UPLOAD_BYTES):
+        """Streams ``fileobj`` into the store and returns the path of its blob.
+
+        The upload is copied in ``CHUNK_SIZE`` pieces into a temp file while it
+        is hashed, so memory use does not depend on the file size. Its first
+        bytes must match one of ``IMAGE_SIGNATURES`` (which also picks the file
+        extension) and it may not exceed ``max_bytes``; otherwise
+        ``UploadRejected`` is raised and nothing is stored. Uploading content
+        that is already stored only adds a reference.
+        """
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        # Created like a plain open() so blobs get the umask default mode (mkstemp would make them 0600)
+        tmp_path = os.path.join(tmp_dir, f"{os.getpid()}.{threading.get_ident()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            suffix = None
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = fileobj.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if suffix is None:
+                        suffix = _detect_image_suffix(chunk)
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadRejected(f"Upload is larger than {max_bytes // (1024 * 1024)} MB.")
+                    digest.update(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            if suffix is None:
+                raise UploadRejected("Upload is empty.")
+            path = self.blob_path(digest.hexdigest(), suffix)
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if os.path.exists(path):
+                    # Refresh the mtime so the sweeper's grace period covers this new reference
+                    os.utime(path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp_path, path)
+                self.add(path)
+                conn.execute("INSERT INTO refs (path, count) VALUES (?, 1) "
+                             "ON CONFLICT (path) DO UPDATE SET count = count + 1", (path,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def release(self, path):
+        """Drops one reference to ``path`` and returns True if the file was deleted.
+
+        Files that were never stored here (uploads from before the store
+        existed) have a single owner, so they are deleted straight away.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT count FROM refs WHERE path = ?", (path,)).fetchone()
+            if row is not None and row[0] > 1:
+                conn.execute("UPDATE refs SET count = count - 1 WHERE path = ?", (path,))
+                freed = False
+            else:
+                conn.execute("DELETE FROM refs WHERE path = ?", (path,))
+                self.remove(path)
+                freed = True
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return freed
+
+    # --- Orphan collection ---
+    def sweep(self, keep, grace=ORPHAN_GRACE, limit=SWEEP_BATCH):
+        """Deletes up to ``limit`` files that are not in ``keep`` and are older than ``grace`` seconds.
+
+        ``keep`` lists every path still in use (images and their renditions).
+        Leftover temp files, blobs of crashed or failed writes and renditions
+        of deleted images are reclaimed. The age is re-checked inside the
+        reference transaction, so a concurrent ``put`` of the same content
+        always wins. Returns the deleted paths.
+        """
+        files = self._scan()
+        self._index = files
+        self._missing = set()
+        keep = {os.path.normpath(path) for path in keep}
+        conn = self._connection()
+        removed = []
+        for path in files - keep:
+            if len(removed) >= limit:
+                break
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                try:
+                    is_orphan = time.time() - os.path.getmtime(path) >= grace
+                except FileNotFoundError:
+                    is_orphan = False
+                if is_orphan:
+                    conn.execute("DELETE FROM refs WHERE path = ?", (path,))
+                    self.remove(path)
+                    removed.append(path)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def has_references(self):
+        """Returns True if any blob still has a recorded reference."""
+        return self._connection().execute("SELECT 1 FROM refs LIMIT 1").fetchone() is not None
+
+    def start_sweeper(self, keep_paths, interval=SWEEP_INTERVAL):
+        """Runs ``sweep(keep_paths())`` every ``interval`` seconds on a daemon thread.
+
+        ``keep_paths`` may return None to skip a pass, e.g. when the posts
+        could not be read and every file would look orphaned.
+        """
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    keep = keep_paths()
+                    if keep is not None:
+                        self.sweep(keep)
+                except Exception:
+                    # A failed pass (e.g. a locked database) is simply retried next interval.
+                    pass
+
+        self._sweeper = threading.Thread(target=run, daemon=True, name='upload-sweeper')
+        self._sweeper.start()